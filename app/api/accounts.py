@@ -1,53 +1,157 @@
-from typing import List
+from typing import Literal, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 
+from app.core.config import settings
 from app.core.dependencies import get_current_user, require_role
-from app.db.session import get_db
-from app.schemas.account import AccountCreate, AccountResponse, AccountUpdate
+from app.core.etag import (
+    etag_matches,
+    not_modified,
+    page_etag,
+    resource_etag,
+    tag_by_content,
+)
+from app.core.responses import (
+    NDJSON_MEDIA_TYPE,
+    PydanticJSONResponse,
+    build_page,
+    stream_ndjson,
+    validate_result,
+    wants_ndjson,
+)
+from app.db.session import DbSession, get_db, get_session_factory, run_db
+from app.schemas.account import (
+    AccountCreate,
+    AccountResponse,
+    AccountUpdate,
+    AccountWithLinesResponse,
+)
+from app.schemas.pagination import Page
 from app.schemas.user import UserRole
 from app.services.account_service import (
     create_account,
-    get_account_by_id,
+    export_accounts,
+    get_account_cached,
+    get_account_page_versions,
+    get_account_version,
+    get_account_with_lines_cached,
     get_accounts,
+    get_accounts_with_lines,
+    search_accounts,
     update_account,
 )
+from app.services.idempotency_service import run_idempotent
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
 
 @router.post("/", response_model=AccountResponse)
-def create_new_account(
+async def create_new_account(
     account: AccountCreate,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: DbSession = Depends(get_db),
     user=Depends(require_role(UserRole.ADMIN)),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
-    created = create_account(db, account, actor=user)
-    return AccountResponse.model_validate(created)
+    async def create():
+        created = await run_db(
+            db, validate_result(AccountResponse, create_account), account, actor=user
+        )
+        return PydanticJSONResponse(created)
+
+    return await run_idempotent(db, request, user, idempotency_key, create)
+
 
+# `include=lines` nests each account's lines in the response
+Include = Optional[Literal["lines"]]
+
+
+@router.get(
+    "/",
+    response_model=Union[Page[AccountWithLinesResponse], Page[AccountResponse]],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_accounts(
+    db: DbSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
+    user=Depends(get_current_user),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    include: Include = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    # Every account, one per line; `limit` and `cursor` do not apply
+    if wants_ndjson(accept):
+        return stream_ndjson(
+            AccountWithLinesResponse if include else AccountResponse,
+            session_factory,
+            export_accounts,
+            settings.STREAM_BATCH_SIZE,
+            bool(include),
+        )
 
-@router.get("/", response_model=List[AccountResponse])
-def list_accounts(
-    db: Session = Depends(get_db), user=Depends(get_current_user), limit: int = Query(100, ge=1)
+    if include:
+        accounts, next_cursor = await run_db(
+            db, get_accounts_with_lines, limit=limit, cursor=cursor
+        )
+        page = build_page(AccountWithLinesResponse, accounts, next_cursor)
+        return tag_by_content(PydanticJSONResponse(page), if_none_match)
+
+    if if_none_match:
+        rows, next_cursor = await run_db(db, get_account_page_versions, limit=limit, cursor=cursor)
+        etag = page_etag(rows, next_cursor)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    accounts, next_cursor = await run_db(db, get_accounts, limit=limit, cursor=cursor)
+    page = build_page(AccountResponse, accounts, next_cursor)
+    return PydanticJSONResponse(page, headers={"ETag": page_etag(page.items, next_cursor)})
+
+
+@router.get("/search", response_model=Page[AccountResponse])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    db: DbSession = Depends(get_db),
+    user=Depends(get_current_user),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+):
+    accounts, next_cursor = await run_db(db, search_accounts, q, limit=limit, cursor=cursor)
+    return PydanticJSONResponse(build_page(AccountResponse, accounts, next_cursor))
+
+
+@router.get("/{account_id}", response_model=Union[AccountWithLinesResponse, AccountResponse])
+async def get_account(
+    account_id: UUID,
+    response: Response,
+    db: DbSession = Depends(get_db),
+    user=Depends(get_current_user),
+    include: Include = Query(None),
+    if_none_match: Optional[str] = Header(None),
 ):
-    accounts = get_accounts(db, limit=limit)
-    return [AccountResponse.model_validate(a) for a in accounts]
+    if include:
+        account = await run_db(db, get_account_with_lines_cached, account_id)
+        return tag_by_content(PydanticJSONResponse(account), if_none_match)
 
+    if if_none_match:
+        etag = resource_etag(account_id, await run_db(db, get_account_version, account_id))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-@router.get("/{account_id}", response_model=AccountResponse)
-def get_account(account_id: UUID, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    account = get_account_by_id(db, account_id)
-    return AccountResponse.model_validate(account)
+    account = await run_db(db, get_account_cached, account_id)
+    response.headers["ETag"] = resource_etag(account.id, account.version)
+    return account
 
 
 @router.put("/{account_id}", response_model=AccountResponse)
-def update_existing_account(
+async def update_existing_account(
     account_id: UUID,
     account: AccountUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user=Depends(require_role(UserRole.ADMIN)),
 ):
-    updated = update_account(db, account_id, account, actor=user)
-    return AccountResponse.model_validate(updated)
+    return await run_db(
+        db, validate_result(AccountResponse, update_account), account_id, account, actor=user
+    )
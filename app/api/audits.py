@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.core.dependencies import require_role
+from app.core.responses import PydanticJSONResponse, build_page, stream_ndjson
+from app.db.session import DbSession, get_db, get_session_factory, run_db
+from app.schemas.audit import AuditFilter, AuditResponse
+from app.schemas.pagination import Page
+from app.schemas.user import UserRole
+from app.services.audit_archive import AuditArchive, get_audit_archive
+from app.services.audit_service import export_audits, get_audits
+
+router = APIRouter(prefix="/audits", tags=["Audits"])
+
+
+@router.get("/", response_model=Page[AuditResponse])
+async def list_audits(
+    filters: AuditFilter = Depends(),
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    include_archived: bool = Query(False),
+    archive: AuditArchive = Depends(get_audit_archive),
+):
+    audits, next_cursor = await run_db(
+        db,
+        get_audits,
+        filters,
+        limit=limit,
+        cursor=cursor,
+        archive=archive if include_archived else None,
+    )
+    return PydanticJSONResponse(build_page(AuditResponse, audits, next_cursor))
+
+
+@router.get("/export")
+def export_audit_log(
+    filters: AuditFilter = Depends(),
+    session_factory=Depends(get_session_factory),
+    user=Depends(require_role(UserRole.ADMIN)),
+    include_archived: bool = Query(False),
+    archive: AuditArchive = Depends(get_audit_archive),
+):
+    return stream_ndjson(
+        AuditResponse,
+        session_factory,
+        export_audits,
+        filters,
+        settings.AUDIT_EXPORT_BATCH_SIZE,
+        archive if include_archived else None,
+    )
@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_user, get_job_manager
+from app.core.exceptions import NotFoundException
+from app.core.jobs import JobManager
+from app.schemas.job import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    jobs: JobManager = Depends(get_job_manager),
+    user=Depends(get_current_user),
+):
+    job = jobs.get(job_id)
+
+    if not job:
+        raise NotFoundException(detail="Job not found")
+
+    return JobResponse.model_validate(job)
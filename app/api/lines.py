@@ -1,68 +1,205 @@
-from typing import List
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query, Request, status
 
-from app.core.dependencies import get_current_user, require_role
-from app.db.session import get_db
-from app.schemas.line import LineCreate, LineResponse, LineUpdateStatus
+from app.core.config import settings
+from app.core.dependencies import get_current_user, get_job_manager, require_role
+from app.core.etag import etag_matches, not_modified, page_etag
+from app.core.jobs import JobManager
+from app.core.responses import (
+    NDJSON_MEDIA_TYPE,
+    PydanticJSONResponse,
+    stream_ndjson,
+    validate_result,
+    wants_ndjson,
+)
+from app.db.session import DbSession, get_db, get_session_factory, run_db
+from app.schemas.job import JobResponse
+from app.schemas.line import (
+    LineAllocate,
+    LineBatchCommission,
+    LineBulkCreate,
+    LineBulkCreateResult,
+    LineBulkStatusResult,
+    LineBulkStatusUpdate,
+    LineCreate,
+    LineResponse,
+    LineUpdateStatus,
+)
+from app.schemas.pagination import Page
 from app.schemas.user import UserRole
+from app.services.account_service import get_account_version
+from app.services.idempotency_service import run_idempotent
 from app.services.line_service import (
     commission_line,
+    commission_lines,
     create_line,
+    create_lines_bulk,
     delete_line,
-    get_lines_by_account,
+    export_lines_by_account,
+    get_line_by_msisdn,
+    get_line_page_versions,
+    get_lines_by_account_cached,
     update_line_status,
+    update_line_status_bulk,
 )
+from app.services.number_pool_service import allocate_line
 
 router = APIRouter(tags=["Lines"])
 
 
 @router.post("/accounts/{account_id}/lines", response_model=LineResponse)
-def create_new_line(
+async def create_new_line(
     account_id: UUID,
     line: LineCreate,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    async def create():
+        created = await run_db(
+            db, validate_result(LineResponse, create_line), account_id, line, actor=user
+        )
+        return PydanticJSONResponse(created)
+
+    return await run_idempotent(db, request, user, idempotency_key, create)
+
+
+@router.post("/accounts/{account_id}/lines:bulk", response_model=LineBulkCreateResult)
+async def create_new_lines_bulk(
+    account_id: UUID,
+    bulk: LineBulkCreate,
+    db: DbSession = Depends(get_db),
     user=Depends(require_role(UserRole.ADMIN)),
 ):
-    created = create_line(db, account_id, line, actor=user)
-    return LineResponse.model_validate(created)
+    return await run_db(db, create_lines_bulk, account_id, bulk.lines, actor=user)
 
 
-@router.get("/accounts/{account_id}/lines", response_model=List[LineResponse])
-def list_lines_for_account(
+@router.post("/accounts/{account_id}/lines:allocate", response_model=LineResponse)
+async def allocate_new_line(
     account_id: UUID,
-    db: Session = Depends(get_db),
+    allocation: LineAllocate,
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+):
+    return await run_db(
+        db, validate_result(LineResponse, allocate_line), account_id, allocation, actor=user
+    )
+
+
+@router.get(
+    "/accounts/{account_id}/lines",
+    response_model=Page[LineResponse],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_lines_for_account(
+    account_id: UUID,
+    db: DbSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
     user=Depends(get_current_user),
-    limit: int = Query(100, ge=1),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    if wants_ndjson(accept):
+        # Answer 404 now; once streaming has started the status can no longer change
+        await run_db(db, get_account_version, account_id)
+        return stream_ndjson(
+            LineResponse,
+            session_factory,
+            export_lines_by_account,
+            account_id,
+            settings.STREAM_BATCH_SIZE,
+        )
+
+    if if_none_match:
+        rows, next_cursor = await run_db(
+            db, get_line_page_versions, account_id, limit=limit, cursor=cursor
+        )
+        etag = page_etag(rows, next_cursor)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    page = await run_db(db, get_lines_by_account_cached, account_id, limit=limit, cursor=cursor)
+    return PydanticJSONResponse(page, headers={"ETag": page_etag(page.items, page.next_cursor)})
+
+
+@router.get("/lines/by-msisdn/{msisdn}", response_model=LineResponse)
+async def get_line_for_msisdn(
+    msisdn: str, db: DbSession = Depends(get_db), user=Depends(get_current_user)
 ):
-    lines = get_lines_by_account(db, account_id, limit=limit)
-    return [LineResponse.model_validate(line) for line in lines]
+    return await run_db(db, validate_result(LineResponse, get_line_by_msisdn), msisdn)
 
 
 @router.patch("/lines/{line_id}/status", response_model=LineResponse)
-def change_line_status(
+async def change_line_status(
     line_id: UUID,
     status_update: LineUpdateStatus,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+):
+    return await run_db(
+        db,
+        validate_result(LineResponse, update_line_status),
+        line_id,
+        status_update.status,
+        actor=user,
+    )
+
+
+@router.post("/lines/status:bulk", response_model=LineBulkStatusResult)
+async def change_line_statuses(
+    change: LineBulkStatusUpdate,
+    db: DbSession = Depends(get_db),
     user=Depends(require_role(UserRole.ADMIN)),
 ):
-    updated = update_line_status(db, line_id, status_update.status, actor=user)
-    return LineResponse.model_validate(updated)
+    return await run_db(db, update_line_status_bulk, change, actor=user)
 
 
 @router.delete("/lines/{line_id}", response_model=LineResponse)
-def remove_line(
-    line_id: UUID, db: Session = Depends(get_db), user=Depends(require_role(UserRole.ADMIN))
+async def remove_line(
+    line_id: UUID, db: DbSession = Depends(get_db), user=Depends(require_role(UserRole.ADMIN))
+):
+    return await run_db(db, validate_result(LineResponse, delete_line), line_id, actor=user)
+
+
+@router.post(
+    "/lines/{line_id}/commission",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def commission_line_endpoint(
+    line_id: UUID,
+    request: Request,
+    db: DbSession = Depends(get_db),
+    jobs: JobManager = Depends(get_job_manager),
+    session_factory=Depends(get_session_factory),
+    user=Depends(require_role(UserRole.ADMIN)),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
-    deleted = delete_line(db, line_id, actor=user)
-    return LineResponse.model_validate(deleted)
+    async def commission():
+        job = await run_db(db, commission_line, jobs, session_factory, line_id, actor=user)
+        return PydanticJSONResponse(
+            JobResponse.model_validate(job), status_code=status.HTTP_202_ACCEPTED
+        )
+
+    return await run_idempotent(db, request, user, idempotency_key, commission)
 
 
-@router.post("/lines/{line_id}/commission", response_model=LineResponse)
-def commission_line_endpoint(
-    line_id: UUID, db: Session = Depends(get_db), user=Depends(require_role(UserRole.ADMIN))
+@router.post(
+    "/lines/commission:batch",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def commission_lines_endpoint(
+    batch: LineBatchCommission,
+    db: DbSession = Depends(get_db),
+    jobs: JobManager = Depends(get_job_manager),
+    session_factory=Depends(get_session_factory),
+    user=Depends(require_role(UserRole.ADMIN)),
 ):
-    commissioned = commission_line(db, line_id, actor=user)
-    return LineResponse.model_validate(commissioned)
+    job = await run_db(db, commission_lines, jobs, session_factory, batch.line_ids, actor=user)
+    return JobResponse.model_validate(job)
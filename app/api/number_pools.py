@@ -0,0 +1,36 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.core.dependencies import require_role
+from app.core.responses import PydanticJSONResponse, build_page, validate_result
+from app.db.session import DbSession, get_db, run_db
+from app.schemas.number_pool import NumberPoolCreate, NumberPoolResponse
+from app.schemas.pagination import Page
+from app.schemas.user import UserRole
+from app.services.number_pool_service import create_number_pool, get_number_pools
+
+router = APIRouter(prefix="/number-pools", tags=["Number Pools"])
+
+
+@router.post("/", response_model=NumberPoolResponse)
+async def create_new_number_pool(
+    pool: NumberPoolCreate,
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+):
+    return await run_db(
+        db, validate_result(NumberPoolResponse, create_number_pool), pool, actor=user
+    )
+
+
+@router.get("/", response_model=Page[NumberPoolResponse])
+async def list_number_pools(
+    db: DbSession = Depends(get_db),
+    user=Depends(require_role(UserRole.ADMIN)),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+):
+    pools, next_cursor = await run_db(db, get_number_pools, limit=limit, cursor=cursor)
+    return PydanticJSONResponse(build_page(NumberPoolResponse, pools, next_cursor))
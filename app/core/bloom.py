@@ -0,0 +1,81 @@
+import hashlib
+import math
+import threading
+
+from app.core.config import settings
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of strings, for skipping lookups of keys that cannot exist.
+
+    `might_contain` is never False for an added key. For any other key it is True with
+    probability about `error_rate`, as long as no more than `capacity` keys were added.
+    Keys cannot be removed. Until `mark_ready` is called (once the existing keys are
+    loaded), or when `capacity` is 0, every key might be contained.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        self.checks = 0
+        self.negatives = 0  # checks answered "absent", each one a query saved
+        self.ready = False
+
+        bits = 0
+        if capacity > 0:
+            bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+
+        self.num_bits = bits
+        self.num_hashes = max(1, round(bits / capacity * math.log(2))) if bits else 0
+
+        self._lock = threading.Lock()
+        self._bits = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        if not self.num_bits:
+            return
+
+        with self._lock:
+            for position in self._positions(key):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        if not (self.ready and self.num_bits):
+            return True
+
+        self.checks += 1
+        if all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key)):
+            return True
+
+        self.negatives += 1
+        return False
+
+    def mark_ready(self):
+        self.ready = True
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "count": self.count,
+            "capacity": self.capacity,
+            "size_bytes": len(self._bits),
+            "hashes": self.num_hashes,
+            "checks": self.checks,
+            "negatives": self.negatives,
+        }
+
+
+# MSISDNs (E.164) of every line, loaded at startup; a miss skips the duplicate check
+msisdn_filter = BloomFilter(settings.MSISDN_FILTER_CAPACITY, settings.MSISDN_FILTER_ERROR_RATE)
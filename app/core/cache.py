@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+from uuid import UUID
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class ReadCache:
+    """
+    Bounded TTL + LRU cache of read models, grouped by the account they belong to.
+
+    Services invalidate an account's entries after committing a change to the account
+    or its lines. Invalidation bumps an epoch, and a value loaded across an epoch change
+    is returned but not stored, so a read racing a write cannot re-cache stale data.
+
+    Writes made by other processes are picked up through `watch`: at most every
+    `poll_interval` seconds a lookup asks the probe whether the database changed,
+    and drops every entry if it did.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, poll_interval: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[UUID, Hashable], tuple[float, Any]] = OrderedDict()
+        self._keys_by_account: dict[UUID, set[Hashable]] = {}
+        self._epoch = 0
+
+        self._changed: Callable[[], bool] | None = None
+        self._polled_at = 0.0
+
+    def watch(self, changed: Callable[[], bool] | None):
+        """Poll `changed` for writes made outside this process; None stops polling."""
+        self._changed = changed
+        self._polled_at = time.monotonic()
+
+    def get_or_load(self, account_id: UUID, key: Hashable, load: Callable[[], T]) -> T:
+        if self.maxsize <= 0:
+            return load()
+
+        self._poll()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get((account_id, key))
+
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((account_id, key))
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                self._discard((account_id, key))
+
+            self.misses += 1
+            epoch = self._epoch
+
+        value = load()
+
+        with self._lock:
+            if epoch == self._epoch:
+                self._entries[(account_id, key)] = (now + self.ttl, value)
+                self._entries.move_to_end((account_id, key))
+                self._keys_by_account.setdefault(account_id, set()).add(key)
+
+                while len(self._entries) > self.maxsize:
+                    self._discard(next(iter(self._entries)))
+
+        return value
+
+    def invalidate(self, *account_ids: UUID):
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+
+            for account_id in account_ids:
+                for key in self._keys_by_account.pop(account_id, ()):
+                    self._entries.pop((account_id, key), None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._keys_by_account.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "remote_invalidations": self.remote_invalidations,
+        }
+
+    def _discard(self, entry_key: tuple[UUID, Hashable]):
+        account_id, key = entry_key
+        self._entries.pop(entry_key, None)
+
+        keys = self._keys_by_account.get(account_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_account[account_id]
+
+    def _poll(self):
+        changed = self._changed
+        if changed is None:
+            return
+
+        now = time.monotonic()
+        if now - self._polled_at < self.poll_interval:
+            return
+
+        self._polled_at = now
+        if changed():
+            self.clear()
+            self.remote_invalidations += 1
+
+
+read_cache = ReadCache(
+    settings.READ_CACHE_SIZE,
+    settings.READ_CACHE_TTL_SECONDS,
+    poll_interval=settings.READ_CACHE_POLL_INTERVAL_MS / 1000,
+)
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_settings import BaseSettings
@@ -19,6 +20,81 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 24 * 60  # 1 day
+    TOKEN_CACHE_SIZE: int = 10_000  # verified access tokens kept in memory; 0 disables
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt worker processes; 0 verifies in the threadpool
+    LOGIN_MAX_PENDING: int = 32  # logins verifying or waiting before new ones get 503
+    LOGIN_RETRY_AFTER_SECONDS: int = 1
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: int = 3600  # purge revoked/expired tokens; 0 disables
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = 5000  # rows deleted per transaction
+
+    # Commissioning & Background Jobs
+    COMMISSION_DELAY_SECONDS: float = 2.0  # simulated provisioning time
+    JOB_WORKERS: int = 64
+    JOB_QUEUE_MAXSIZE: int = 10_000
+    JOB_HISTORY_SIZE: int = 10_000
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+    COMMISSION_BATCH_MAX_SIZE: int = 10_000
+    COMMISSION_BATCH_PARALLELISM: int = 256  # concurrent provisioning waits per batch
+    COMMISSION_BATCH_CHUNK_SIZE: int = 500  # lines activated per commit
+
+    # Audit Sink
+    AUDIT_SINK: Literal["sync", "batched"] = "sync"  # "batched" = write-behind bulk inserts
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_QUEUE_MAXSIZE: int = 50_000
+    AUDIT_ENQUEUE_TIMEOUT_MS: int = 1000  # backpressure before falling back to a sync write
+    AUDIT_EXPORT_BATCH_SIZE: int = 1000  # rows fetched and written per export chunk
+
+    # Audit Retention
+    AUDIT_RETENTION_DAYS: int = 0  # archive audits older than this many days; 0 disables
+    AUDIT_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    AUDIT_ARCHIVE_BATCH_SIZE: int = 10_000  # rows per archival transaction
+
+    # Pagination
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+    STREAM_BATCH_SIZE: int = 1000  # rows fetched and written per NDJSON chunk
+
+    # Read Cache (GET /accounts/{id} and GET /accounts/{id}/lines)
+    READ_CACHE_SIZE: int = 10_000  # cached accounts and line pages; 0 disables
+    READ_CACHE_TTL_SECONDS: float = 30.0
+    READ_CACHE_POLL_INTERVAL_MS: int = 100  # watch for other processes' writes; 0 disables
+
+    # Idempotency Keys (POST /accounts, /accounts/{id}/lines and /lines/{id}/commission)
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600  # a stored response is replayed for this long
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # a first request that never finishes holds its key
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # retries wait on a running first request, then 409
+    IDEMPOTENCY_SWEEP_INTERVAL_SECONDS: int = 3600  # purge expired keys; 0 disables
+    IDEMPOTENCY_SWEEP_BATCH_SIZE: int = 5000  # rows deleted per transaction
+
+    # Bulk Operations
+    LINE_BULK_MAX_SIZE: int = 10_000
+
+    # MSISDNs
+    MSISDN_DEFAULT_COUNTRY_CODE: str = "254"  # replaces the leading 0 of national numbers
+    MSISDN_FILTER_CAPACITY: int = 1_000_000  # lines the existence filter is sized for; 0 disables
+    MSISDN_FILTER_ERROR_RATE: float = 0.01  # chance an unknown MSISDN still gets a duplicate check
+    NUMBER_POOL_BLOCK_SIZE: int = 100  # pool numbers a worker reserves at a time
+
+    # Database
+    DB_ASYNC: bool = False  # requests on an async engine (aiosqlite) instead of the threadpool
+    DB_SHARDS: int = 1  # >1 spreads accounts and their lines over that many database files
+    SHARD_KEY_SWEEP_INTERVAL_SECONDS: int = 3600  # drop routing keys left by a crash; 0 disables
+    SHARD_KEY_SWEEP_BATCH_SIZE: int = 5000  # routing keys checked per query
+    DB_POOL_SIZE: int = 20  # persistent connections per engine
+    DB_MAX_OVERFLOW: int = 20  # extra connections opened under burst load
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # wait for a free connection before failing
+    DB_LOCK_RETRIES: int = 5  # re-runs of a background unit of work on "database is locked"
+    DB_LOCK_RETRY_BASE_MS: int = 25  # backoff doubles per attempt, with full jitter
+    DB_LOCK_RETRY_MAX_MS: int = 1000
+
+    # SQLite connection profile, applied on every new connection
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait on a locked database before raising
+    SQLITE_CACHE_SIZE: int = -64_000  # pages if positive, KiB if negative (~64 MB)
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes of the file memory-mapped; 0 disables
 
     # Pydantic Configuration
     model_config = {
@@ -44,6 +120,27 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"sqlite:///{self.DB_PATH}"
 
+    @computed_field
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"sqlite+aiosqlite:///{self.DB_PATH}"
+
+    @computed_field
+    @property
+    def SHARD_DB_PATHS(self) -> list[str]:
+        if self.DB_SHARDS <= 1:
+            return []
+
+        return [
+            os.path.join(self.BASE_DIR, "data", f"application.shard{i}.db")
+            for i in range(self.DB_SHARDS)
+        ]
+
+    @computed_field
+    @property
+    def AUDIT_ARCHIVE_DIR(self) -> str:
+        return os.path.join(self.BASE_DIR, "data", "audit_archive")
+
     @computed_field
     @property
     def LOG_DIR(self) -> str:
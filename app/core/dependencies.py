@@ -1,17 +1,18 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
 from app.core.exceptions import ForbiddenException, UnauthorizedException
-from app.core.security import decode_token
+from app.core.jobs import JobManager
+from app.core.security import PasswordHasher, decode_token_cached
 from app.schemas.user import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = decode_token(token)
+        payload = decode_token_cached(token)
         username = payload.get("sub")
         role = payload.get("role")
 
@@ -25,7 +26,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
 
 
 def require_role(required_role: UserRole):
-    def role_checker(user=Depends(get_current_user)):
+    async def role_checker(user=Depends(get_current_user)):
         try:
             user_role = UserRole(user["role"])
 
@@ -38,3 +39,11 @@ def require_role(required_role: UserRole):
         return user
 
     return role_checker
+
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.jobs
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
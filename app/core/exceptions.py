@@ -2,8 +2,8 @@ from fastapi import HTTPException, status
 
 
 class AppException(HTTPException):
-    def __init__(self, status_code: int, detail: str):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: str, headers: dict[str, str] | None = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 
 class BadRequestException(AppException):
@@ -29,3 +29,9 @@ class UnauthorizedException(AppException):
 class ConflictException(AppException):
     def __init__(self, detail="Conflict"):
         super().__init__(status.HTTP_409_CONFLICT, detail)
+
+
+class ServiceUnavailableException(AppException):
+    def __init__(self, detail="Service unavailable", retry_after: int | None = None):
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        super().__init__(status.HTTP_503_SERVICE_UNAVAILABLE, detail, headers=headers)
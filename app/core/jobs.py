@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from uuid import UUID, uuid4
+
+from app.core.exceptions import (
+    AppException,
+    ConflictException,
+    ServiceUnavailableException,
+)
+from app.core.logging import get_logger
+from app.schemas.job import JobStatus
+
+logger = get_logger()
+
+
+@dataclass
+class Job:
+    kind: str
+    resource_id: str | None = None
+    id: UUID = field(default_factory=uuid4)
+    status: JobStatus = JobStatus.QUEUED
+    result: Any = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class JobManager:
+    """
+    Bounded in-process job engine.
+
+    A fixed number of worker tasks consume jobs from a queue on the application's
+    event loop, so long-running waits (e.g. provisioning) never pin a request thread.
+    `submit` is thread-safe and may be called from sync route handlers.
+    """
+
+    def __init__(self, workers: int, max_queue: int, max_history: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_history = max_history
+
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[UUID, Job] = OrderedDict()
+        self._active: dict[tuple[str, str], UUID] = {}
+        self._pending = 0
+        self._accepting = False
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._accepting = True
+
+        logger.info(f"Job manager started with {self.workers} workers")
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        resource_id: str | None = None,
+    ) -> Job:
+        with self._lock:
+            if not self._accepting or self._loop is None:
+                raise ServiceUnavailableException(detail="Job queue is not accepting work")
+
+            if self._pending >= self.max_queue:
+                raise ServiceUnavailableException(detail="Job queue is full")
+
+            key = (kind, resource_id) if resource_id is not None else None
+            if key is not None and key in self._active:
+                raise ConflictException(detail=f"A {kind} job is already in progress")
+
+            job = Job(kind=kind, resource_id=resource_id)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job.id
+
+            self._pending += 1
+            self._evict_history()
+
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (job, func, args))  # type: ignore
+        return job
+
+    def get(self, job_id: UUID) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def shutdown(self, timeout: float):
+        """Stop accepting new jobs and wait (up to `timeout`) for in-flight jobs to finish."""
+        with self._lock:
+            self._accepting = False
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Job drain timed out with {self._pending} job(s) unfinished")
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        logger.info("Job manager stopped")
+
+    async def _worker(self):
+        while True:
+            job, func, args = await self._queue.get()  # type: ignore
+
+            try:
+                await self._run(job, func, args)
+            finally:
+                self._queue.task_done()  # type: ignore
+
+    async def _run(self, job: Job, func, args):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+
+        try:
+            job.result = await func(*args)
+            job.status = JobStatus.SUCCEEDED
+
+        except AppException as exc:
+            job.error = exc.detail
+            job.status = JobStatus.FAILED
+
+        except Exception as exc:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            job.error = str(exc)
+            job.status = JobStatus.FAILED
+
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+            with self._lock:
+                self._pending -= 1
+                if job.resource_id is not None:
+                    self._active.pop((job.kind, job.resource_id), None)
+
+    def _evict_history(self):
+        # Drop the oldest finished jobs once the history bound is exceeded
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+
+            if self._jobs[job_id].status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                del self._jobs[job_id]
+                excess -= 1
@@ -0,0 +1,31 @@
+import re
+
+from app.core.config import settings
+
+SEPARATORS = re.compile(r"[\s().\-/]")
+E164_DIGITS = re.compile(r"[1-9][0-9]{6,14}")
+
+
+def normalize_msisdn(raw: str) -> str:
+    """
+    The E.164 form (`+<country code><number>`) of an MSISDN, as people or networks write it.
+
+    "+254 712-345678" and "00254712345678" are international. A single leading 0 is a
+    national trunk prefix, replaced by `MSISDN_DEFAULT_COUNTRY_CODE`. Any other digits
+    already start with the country code, as they do in network events.
+    """
+    digits = SEPARATORS.sub("", raw)
+
+    if digits.startswith("+"):
+        digits = digits[1:]
+
+    elif digits.startswith("00"):
+        digits = digits[2:]
+
+    elif digits.startswith("0"):
+        digits = settings.MSISDN_DEFAULT_COUNTRY_CODE + digits[1:]
+
+    if not E164_DIGITS.fullmatch(digits):
+        raise ValueError(f"Invalid MSISDN: {raw!r}")
+
+    return f"+{digits}"
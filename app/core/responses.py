@@ -0,0 +1,77 @@
+from functools import cache
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+import pydantic_core
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.schemas.pagination import Page
+
+M = TypeVar("M", bound=BaseModel)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core in a single pass.
+
+    Takes models (and UUIDs, datetimes, enums) as they are, so a route can return an
+    already validated page without FastAPI validating and dumping it again. Routes keep
+    their `response_model` for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+@cache
+def _list_adapter(model: type[M]) -> TypeAdapter[list[M]]:
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def build_page(model: type[M], rows: Iterable[Any], next_cursor: str | None) -> Page[M]:
+    """Validate a page of ORM rows (or dicts) into `Page[model]` with one validator call."""
+    items = _list_adapter(model).validate_python(rows, from_attributes=True)
+    return Page[model].model_construct(items=items, next_cursor=next_cursor)  # type: ignore[valid-type]
+
+
+def validate_result(model: type[M], func: Callable[..., Any]) -> Callable[..., M]:
+    """
+    Wrap a service function so that its result comes back validated into `model`.
+
+    Passed to `run_db`, the ORM instance is read where the session can be used. On
+    the event loop, an attribute expired by the service's commit would be reloaded
+    with a blocking query.
+    """
+
+    def call(db: Session, *args: Any, **kwargs: Any) -> M:
+        return model.model_validate(func(db, *args, **kwargs))
+
+    return call
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    return accept is not None and NDJSON_MEDIA_TYPE in accept
+
+
+def stream_ndjson(
+    model: type[BaseModel],
+    session_factory: Callable[[], Session],
+    export: Callable[..., Iterator[Iterable[Any]]],
+    *args: Any,
+) -> StreamingResponse:
+    """
+    Stream `export(db, *args)` as NDJSON, one `model` per line, a batch per chunk.
+
+    The export gets its own session because the response body is produced after the
+    request's dependencies (and their session) have been torn down.
+    """
+
+    def lines() -> Iterator[str]:
+        with session_factory() as db:
+            for batch in export(db, *args):
+                yield "".join(model.model_validate(row).model_dump_json() + "\n" for row in batch)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,11 +1,22 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def hash_password(password: str) -> str:
@@ -16,6 +27,77 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password; on success also return a new hash if the stored one uses an outdated cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt verification in a dedicated process pool.
+
+    Keeps CPU-bound hashing off the request threadpool and the GIL. Admission is
+    bounded: once `max_pending` verifications are running or waiting, further
+    calls fail fast with a 503 and a `Retry-After` hint instead of piling up.
+    With `workers=0` verification runs in the threadpool instead.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.rejected = 0
+
+        # Only touched from the event loop, so no lock is needed
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self):
+        if self.workers > 0:
+            # Forking a process that already runs threads can deadlock the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceUnavailableException(
+                detail="Too many concurrent logins, please retry", retry_after=self.retry_after
+            )
+
+        self._pending += 1
+        try:
+            if self._executor is None:
+                return await run_in_threadpool(
+                    verify_and_update_password, plain_password, hashed_password
+                )
+
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, verify_and_update_password, plain_password, hashed_password
+            )
+
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
 def create_access_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
@@ -26,3 +108,85 @@ def create_access_token(data: dict, expires_delta: timedelta):
 
 def decode_token(token: str):
     return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified token claims.
+
+    Keyed by the SHA-256 digest of the token (raw tokens are never retained).
+    Entries expire at the token's own `exp`, so a cached token stops being
+    accepted exactly when `jwt.decode` would have started rejecting it.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._digest(token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+
+        key = self._digest(token)
+
+        with self._lock:
+            self._entries[key] = (float(exp), claims)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def decode_token_cached(token: str) -> dict:
+    """Like `decode_token`, but skips signature verification for recently verified tokens."""
+    claims = token_cache.get(token)
+
+    if claims is None:
+        claims = decode_token(token)
+        token_cache.put(token, claims)
+
+    return claims
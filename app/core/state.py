@@ -1,5 +1,6 @@
 from typing import Set
 
+from app.schemas.account import AccountStatus
 from app.schemas.line import LineStatus
 
 # Define allowed transitions for LineStatus
@@ -10,6 +11,27 @@ ALLOWED_TRANSITIONS: dict[LineStatus, Set[LineStatus]] = {
     LineStatus.DELETED: set(),
 }
 
+# ALLOWED_TRANSITIONS inverted: the statuses a line may be moved to each status from,
+# which set-based updates put in their WHERE clause
+ALLOWED_SOURCES: dict[LineStatus, frozenset[LineStatus]] = {
+    target: frozenset(s for s, targets in ALLOWED_TRANSITIONS.items() if target in targets)
+    for target in LineStatus
+}
+
+# Statuses a line may be commissioned from: fresh lines only, and only while the state
+# machine lets them become ACTIVE. Single and batch commissioning both check this set.
+COMMISSIONABLE: frozenset[LineStatus] = (
+    frozenset({LineStatus.PROVISIONED}) & ALLOWED_SOURCES[LineStatus.ACTIVE]
+)
+
+# What an account status change does to the account's lines: the status they move to,
+# and the statuses of the lines that move. Provisioned lines are not yet in service, so
+# suspending the account leaves them to be commissioned later.
+ACCOUNT_CASCADE: dict[AccountStatus, tuple[LineStatus, frozenset[LineStatus]]] = {
+    AccountStatus.SUSPENDED: (LineStatus.SUSPENDED, frozenset({LineStatus.ACTIVE})),
+    AccountStatus.CLOSED: (LineStatus.DELETED, ALLOWED_SOURCES[LineStatus.DELETED]),
+}
+
 
 def _to_line_status(value) -> LineStatus | None:
     if isinstance(value, LineStatus):
@@ -34,5 +56,4 @@ def can_transition(current, target) -> bool:
 
 def is_commissionable(current) -> bool:
     """Return True if a line in `current` status can be commissioned (i.e. PROVISIONED)."""
-    cur = _to_line_status(current)
-    return cur == LineStatus.PROVISIONED
+    return _to_line_status(current) in COMMISSIONABLE
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+
+class PeriodicTask:
+    """Runs a blocking maintenance function in the threadpool every `interval` seconds."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Any]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+        logger.info(f"Periodic task '{self.name}' started (every {self.interval}s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        logger.info(f"Periodic task '{self.name}' stopped")
+
+    async def _loop(self):
+        while True:
+            try:
+                await run_in_threadpool(self.func)
+            except Exception:
+                logger.exception(f"Periodic task '{self.name}' failed")
+
+            await asyncio.sleep(self.interval)
@@ -2,15 +2,21 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import Table, bindparam, inspect, select, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
 
 from app.core.config import settings
 from app.core.exceptions import AppException
 from app.core.logging import get_logger
+from app.core.msisdn import normalize_msisdn
 from app.core.security import hash_password
+from app.db.base import Base
 from app.db.session import SessionLocal
-from app.models.account import Account, AccountStatus
+from app.models.account import ACCOUNT_SEARCH_DDL, Account, AccountStatus
+from app.models.line import Line
 from app.models.user import User
 from app.schemas.account import AccountCreate
 from app.schemas.line import LineCreate
@@ -95,6 +101,86 @@ def _seed_accounts_and_lines(db: Session, accounts: List[Dict[str, Any]]) -> Non
                 logger.error(f"  Failed to create line {line.get('msisdn')}: {e}")
 
 
+def create_indexes(bind: Engine, tables: list[Table] | None = None) -> None:
+    """Create model indexes missing from an existing database (create_all skips existing tables)."""
+    for table in tables or Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def add_missing_columns(bind: Engine, tables: list[Table] | None = None) -> None:
+    """Add model columns missing from existing tables; new columns need a server default."""
+    inspector = inspect(bind)
+
+    with bind.begin() as conn:
+        for table in tables or Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                    logger.info(f"Added column {table.name}.{column.name}")
+
+
+def create_search_index(bind: Engine) -> None:
+    """Create the accounts search index on a database that predates it, and fill it."""
+    if inspect(bind).has_table("accounts_fts"):
+        return
+
+    with bind.begin() as conn:
+        for statement in ACCOUNT_SEARCH_DDL:
+            conn.exec_driver_sql(statement)
+
+        conn.exec_driver_sql("INSERT INTO accounts_fts (accounts_fts) VALUES ('rebuild')")
+
+    logger.info("Built the accounts search index")
+
+
+def backfill_msisdn_keys(bind: Engine) -> None:
+    """Fill `lines.msisdn_e164` on rows written before it existed."""
+    lines = Line.__table__
+
+    with bind.begin() as conn:
+        pending = conn.execute(
+            select(lines.c.id, lines.c.msisdn).where(lines.c.msisdn_e164.is_(None))
+        )
+        pending = pending.all()
+        if not pending:
+            return
+
+        taken = set(conn.execute(select(lines.c.msisdn_e164)).scalars())
+        rows = []
+
+        for line_id, msisdn in pending:
+            try:
+                key = normalize_msisdn(msisdn)
+            except ValueError:
+                logger.warning(
+                    f"Line {line_id}: MSISDN {msisdn!r} does not normalize; left unkeyed"
+                )
+                continue
+
+            if key in taken:
+                logger.warning(f"Line {line_id}: MSISDN {msisdn!r} duplicates {key}; left unkeyed")
+                continue
+
+            taken.add(key)
+            rows.append({"line_id": line_id, "key": key})
+
+        if rows:
+            conn.execute(
+                update(lines)
+                .where(lines.c.id == bindparam("line_id"))
+                .values(msisdn_e164=bindparam("key")),
+                rows,
+            )
+
+    logger.info(f"Normalized {len(rows)}/{len(pending)} line MSISDNs")
+
+
 def init_db() -> int:
     data = _load_sample_data(SAMPLE_FILE)
     if not data:
@@ -1,19 +1,113 @@
+from typing import Any, Callable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.db.sharding import RoutedSession, shard_names, sharding_options
+from app.db.sqlite import configure_engine
+
+T = TypeVar("T")
+
+# A request's session: sync by default, async when DB_ASYNC is enabled
+DbSession = Session | AsyncSession
+
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+}
+
+
+def _create_sqlite_engine(url: str):
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # SQLite requirement
+        **POOL_OPTIONS,
+    )
+    configure_engine(sqlite_engine)
+    return sqlite_engine
+
+
+def _create_async_sqlite_engine(url: str):
+    sqlite_engine = create_async_engine(url, **POOL_OPTIONS)
+    configure_engine(sqlite_engine.sync_engine)
+    return sqlite_engine
+
+
+engine = _create_sqlite_engine(settings.DATABASE_URL)
+
+# With DB_SHARDS > 1, accounts and their lines live in one extra database file per
+# shard; `engine` keeps everything else plus the routing index of unique keys
+shard_engines = {
+    name: _create_sqlite_engine(f"sqlite:///{path}")
+    for name, path in zip(shard_names(settings.DB_SHARDS), settings.SHARD_DB_PATHS)
+}
+
+if shard_engines:
+    SessionLocal = sessionmaker(
+        class_=RoutedSession, autoflush=False, **sharding_options(engine, shard_engines)
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite requirement
+# The async engine serves request handlers only; background jobs, the audit writer
+# and maintenance tasks keep using the sync engine above
+async_engine = (
+    _create_async_sqlite_engine(settings.ASYNC_DATABASE_URL) if settings.DB_ASYNC else None
 )
+async_shard_engines = {
+    name: _create_async_sqlite_engine(f"sqlite+aiosqlite:///{path}")
+    for name, path in (zip(shard_engines, settings.SHARD_DB_PATHS) if settings.DB_ASYNC else ())
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Instances are read after the handler's last commit, outside any greenlet, so they
+# must not be expired (an expired attribute cannot lazy-load there)
+if async_engine is not None and async_shard_engines:
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutedSession,
+        autoflush=False,
+        expire_on_commit=False,
+        **sharding_options(
+            async_engine.sync_engine,
+            {name: e.sync_engine for name, e in async_shard_engines.items()},
+        ),
+    )
+else:
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
-def get_db():
+def get_session_factory():
+    """Session factory for work that outlives the request (e.g. background jobs)."""
+    return SessionLocal
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if settings.DB_ASYNC else get_sync_db
+
+
+async def run_db(db: DbSession, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a (sync) service function against a request session without blocking the event loop.
+
+    With an `AsyncSession` the function runs on the loop via `run_sync`, its I/O awaited
+    on the async driver; with a sync `Session` it runs in the threadpool as before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: func(session, *args, **kwargs))
+
+    return await run_in_threadpool(func, db, *args, **kwargs)
@@ -0,0 +1,310 @@
+from collections import defaultdict
+from typing import Any, Iterable
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Mapper, ORMExecuteState
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.account import Account
+from app.models.line import Line
+from app.models.shard import ShardKey
+
+logger = get_logger()
+
+# Users, tokens, audits and the routing index live in the main database
+GLOBAL_SHARD = "global"
+
+# An account and all of its lines live together on the shard chosen by the account id
+SHARDED_TABLES = [Account.__table__, Line.__table__]
+
+
+def shard_names(count: int) -> list[str]:
+    return [f"shard{i}" for i in range(count)]
+
+
+def _as_uuid(value: Any) -> UUID | None:
+    if isinstance(value, UUID):
+        return value
+
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+class ShardRouter:
+    """
+    Maps accounts, and the lines that belong to them, onto shards by account id.
+
+    Statements that pin an account id (`Account.id == x`, `Line.account_id IN (...)`
+    in the top-level AND of the WHERE clause) go to the owning shards only; other
+    statements over accounts or lines are scattered to every shard and their results
+    concatenated. Everything else is served by the global database.
+    """
+
+    def __init__(self, shards: list[str]):
+        self.shards = shards
+
+    def shard_for(self, account_id: UUID) -> str:
+        # Account ids are random UUIDs, so their integer value is already well mixed
+        return self.shards[account_id.int % len(self.shards)]
+
+    def shard_chooser(self, mapper: Mapper | None, instance: Any, clause=None) -> str:
+        if mapper is not None and instance is not None:
+            if mapper.class_ is Account:
+                # Ids are normally assigned at INSERT time; routing needs one up front
+                if instance.id is None:
+                    instance.id = uuid4()
+                return self.shard_for(instance.id)
+
+            if mapper.class_ is Line:
+                return self.shard_for(instance.account_id)
+
+        return GLOBAL_SHARD
+
+    def shard_for_row(self, mapper: Mapper, row: dict) -> str:
+        if mapper.class_ is Account:
+            return self.shard_for(_as_uuid(row["id"]))  # type: ignore[arg-type]
+
+        if mapper.class_ is Line:
+            return self.shard_for(_as_uuid(row["account_id"]))  # type: ignore[arg-type]
+
+        return GLOBAL_SHARD
+
+    def identity_chooser(self, mapper: Mapper, primary_key, *, lazy_loaded_from, **kw):
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token is not None:
+            return [lazy_loaded_from.identity_token]
+
+        if mapper.class_ is Account:
+            return [self.shard_for(primary_key[0])]
+
+        if mapper.class_ is Line:
+            return self.shards
+
+        return [GLOBAL_SHARD]
+
+    def execute_chooser(self, context: ORMExecuteState) -> Iterable[str]:
+        mapper = context.bind_mapper
+        if mapper is None or mapper.class_ not in (Account, Line):
+            return [GLOBAL_SHARD]
+
+        key_column = Account.__table__.c.id if mapper.class_ is Account else Line.account_id
+        params = context.parameters if isinstance(context.parameters, dict) else {}
+        account_ids = set(self._pinned_values(context.statement.whereclause, key_column, params))
+
+        if account_ids and None not in account_ids:
+            return sorted({self.shard_for(account_id) for account_id in account_ids})  # type: ignore[arg-type]
+
+        return self.shards
+
+    def _pinned_values(self, clause, column, params: dict) -> Iterable[UUID | None]:
+        """Yield the values `column` is restricted to by the top-level AND of `clause`."""
+        if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+            for child in clause.clauses:
+                yield from self._pinned_values(child, column, params)
+
+        elif (
+            isinstance(clause, BinaryExpression)
+            and clause.left.shares_lineage(column.expression)
+            and isinstance(clause.right, BindParameter)
+        ):
+            # Values of an unset bind (e.g. selectinload's IN list) come with the execution
+            value = clause.right.effective_value
+            if value is None:
+                value = params.get(clause.right.key)
+
+            if clause.operator is operators.eq:
+                yield _as_uuid(value)
+
+            elif clause.operator is operators.in_op:
+                yield from (_as_uuid(v) for v in value) if value is not None else [None]
+
+
+class RoutedSession(ShardedSession):
+    """Sharded session that also maintains the global routing index of unique keys."""
+
+    def __init__(self, *args, router: ShardRouter, **kwargs):
+        super().__init__(
+            *args,
+            shard_chooser=router.shard_chooser,
+            identity_chooser=router.identity_chooser,
+            execute_chooser=router.execute_chooser,
+            **kwargs,
+        )
+        self.router = router
+
+
+@event.listens_for(RoutedSession, "before_flush")
+def _claim_unique_keys(session: RoutedSession, flush_context, instances):
+    """
+    Register emails and MSISDNs (E.164) in the routing index alongside the rows that use them.
+
+    The index has one primary key across all shards, so a key already owned by
+    another shard fails the flush with an IntegrityError, just like a UNIQUE column.
+    """
+    router = session.router
+
+    for obj in list(session.new):
+        if isinstance(obj, Account):
+            shard = router.shard_chooser(Account.__mapper__, obj)
+            session.add(ShardKey(kind="email", value=obj.email, shard=shard))
+
+        elif isinstance(obj, Line):
+            shard = router.shard_for(obj.account_id)
+            session.add(ShardKey(kind="msisdn", value=obj.msisdn_e164, shard=shard))
+
+    for obj in list(session.dirty):
+        if not isinstance(obj, Account):
+            continue
+
+        history = inspect(obj).attrs.email.history
+        if not history.added:
+            continue
+
+        # The old value is only in the history if it was loaded before being replaced
+        previous = history.deleted[0] if history.deleted else _stored_email(session, obj.id)
+        if previous == history.added[0]:
+            continue
+
+        stale = session.get(ShardKey, ("email", previous))
+        if stale is not None:
+            session.delete(stale)
+
+        session.add(ShardKey(kind="email", value=history.added[0], shard=router.shard_for(obj.id)))
+
+
+def _stored_email(session: RoutedSession, account_id: UUID) -> str | None:
+    return session.query(Account.email).filter(Account.id == account_id).scalar()
+
+
+@event.listens_for(RoutedSession, "do_orm_execute")
+def _route_bulk_inserts(context: ORMExecuteState):
+    """
+    Run ORM bulk INSERTs (`session.execute(insert(Model), rows)`) shard by shard.
+
+    ShardedSession cannot execute them itself, so rows are grouped by owning shard and
+    inserted with Core statements; bulk lines claim their MSISDNs in the routing index.
+    """
+    mapper = context.bind_mapper
+    if not (context.is_orm_statement and context.is_insert and mapper is not None):
+        return None
+
+    if not isinstance(context.parameters, list):
+        return None
+
+    session: RoutedSession = context.session  # type: ignore[assignment]
+    router = session.router
+
+    by_shard: dict[str, list[dict]] = defaultdict(list)
+    for row in context.parameters:
+        by_shard[router.shard_for_row(mapper, row)].append(row)
+
+    if mapper.class_ is Line:
+        session.execute(
+            insert(ShardKey.__table__),
+            [
+                {"kind": "msisdn", "value": row["msisdn_e164"], "shard": shard}
+                for shard, rows in by_shard.items()
+                for row in rows
+            ],
+            bind_arguments={"shard_id": GLOBAL_SHARD},
+        )
+
+    result = None
+    for shard, rows in by_shard.items():
+        result = session.execute(
+            insert(mapper.local_table), rows, bind_arguments={"shard_id": shard}
+        )
+
+    return result
+
+
+class ShardKeyReconciler:
+    """
+    Removes routing index keys whose row is not on the shard the key names.
+
+    A key and its row are committed to different files, one after the other, so a
+    crash in between can leave a key that blocks its email or MSISDN for good. A key
+    is only removed once two consecutive sweeps have found it orphaned, so a write
+    whose second commit is still on its way is never taken for one.
+    """
+
+    # The column each kind of key is claimed from
+    columns = {"email": Account.__table__.c.email, "msisdn": Line.__table__.c.msisdn_e164}
+
+    def __init__(self):
+        self._suspects: set[tuple[str, str, str]] = set()
+        self.removed = 0
+
+    def sweep(self, db: RoutedSession, batch_size: int) -> int:
+        orphans: set[tuple[str, str, str]] = set()
+        for kind in self.columns:
+            last = ""
+            while True:
+                keys = db.execute(
+                    select(ShardKey.value, ShardKey.shard)
+                    .where(ShardKey.kind == kind, ShardKey.value > last)
+                    .order_by(ShardKey.value)
+                    .limit(batch_size)
+                ).all()
+                if not keys:
+                    break
+
+                orphans |= self._orphans(db, kind, keys)
+                last = keys[-1].value
+
+        confirmed = orphans & self._suspects
+        self._suspects = orphans - confirmed
+
+        for kind, value, shard in sorted(confirmed):
+            db.execute(
+                delete(ShardKey).where(
+                    ShardKey.kind == kind, ShardKey.value == value, ShardKey.shard == shard
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            logger.warning(f"Removed orphaned routing key {kind} {value} (no row on {shard})")
+        db.commit()
+
+        self.removed += len(confirmed)
+        return len(confirmed)
+
+    def _orphans(self, db: RoutedSession, kind: str, keys) -> set[tuple[str, str, str]]:
+        column = self.columns[kind]
+
+        by_shard: dict[str, list[str]] = defaultdict(list)
+        for key in keys:
+            by_shard[key.shard].append(key.value)
+
+        orphans = set()
+        for shard, values in by_shard.items():
+            present = set(
+                db.execute(
+                    select(column).where(column.in_(values)), bind_arguments={"shard_id": shard}
+                ).scalars()
+            )
+            orphans |= {(kind, value, shard) for value in values if value not in present}
+
+        return orphans
+
+
+shard_key_reconciler = ShardKeyReconciler()
+
+
+def run_shard_key_sweep(session_factory) -> int:
+    with session_factory() as db:
+        return shard_key_reconciler.sweep(db, settings.SHARD_KEY_SWEEP_BATCH_SIZE)
+
+
+def sharding_options(global_bind: Engine, shard_binds: dict[str, Engine]) -> dict:
+    """Session options for a RoutedSession over the global database and the shards."""
+    return {
+        "shards": {GLOBAL_SHARD: global_bind, **shard_binds},
+        "router": ShardRouter(list(shard_binds)),
+    }
@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from typing import Callable, Iterable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+LOCK_ERRORS = ("database is locked", "database table is locked")
+
+
+def apply_pragmas(dbapi_connection, connection_record):
+    """Apply the configured SQLite profile to every new pooled connection."""
+    cursor = dbapi_connection.cursor()
+
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+
+    finally:
+        cursor.close()
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    return isinstance(exc, OperationalError) and any(m in str(exc.orig) for m in LOCK_ERRORS)
+
+
+class LockMetrics:
+    """Counters for SQLite lock contention, exposed at /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.errors = 0  # lock errors raised by any statement, retried or not
+        self.retries = 0
+        self.exhausted = 0  # units of work that gave up after the last retry
+        self.wait_seconds = 0.0  # time spent backing off before retries
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_retry(self, delay: float):
+        with self._lock:
+            self.retries += 1
+            self.wait_seconds += delay
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def stats(self) -> dict:
+        return {
+            "errors": self.errors,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+lock_metrics = LockMetrics()
+
+
+def _count_lock_errors(context):
+    if is_lock_error(context.sqlalchemy_exception or context.original_exception):
+        lock_metrics.record_error()
+
+
+def configure_engine(engine: Engine):
+    """Install the connection profile and lock accounting on a (sync) engine."""
+    event.listen(engine, "connect", apply_pragmas)
+    event.listen(engine, "handle_error", _count_lock_errors)
+
+
+def retry_on_lock(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a unit of work, retrying it with jittered exponential backoff on lock contention.
+
+    `func` must be safe to re-run from scratch: it opens its own session and commits
+    once, so a failed attempt leaves nothing behind.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+
+            if attempt >= settings.DB_LOCK_RETRIES:
+                lock_metrics.record_exhausted()
+                logger.error(f"Database still locked after {attempt} retries; giving up")
+                raise
+
+            # Full jitter keeps contending writers from retrying in lockstep
+            cap = settings.DB_LOCK_RETRY_MAX_MS / 1000
+            delay = random.uniform(0, min(cap, settings.DB_LOCK_RETRY_BASE_MS / 1000 * 2**attempt))
+
+            lock_metrics.record_retry(delay)
+            logger.warning(f"Database locked; retrying in {delay * 1000:.0f}ms")
+
+            time.sleep(delay)
+            attempt += 1
+
+
+class DataVersionProbe:
+    """
+    Tells whether anything has committed to a set of SQLite databases since the last check.
+
+    `PRAGMA data_version` changes on a connection whenever a *different* connection,
+    in this process or any other, commits; so each database is watched through a
+    dedicated connection held for the probe's lifetime.
+    """
+
+    def __init__(self, engines: Iterable[Engine]):
+        self._engines = list(engines)
+        self._lock = threading.Lock()
+        self._connections: list | None = None
+        self._versions: tuple[int, ...] | None = None
+
+    def changed(self) -> bool:
+        with self._lock:
+            if self._connections is None:
+                self._connections = [e.raw_connection() for e in self._engines]
+
+            versions = tuple(self._data_version(c) for c in self._connections)
+            changed = self._versions is not None and versions != self._versions
+            self._versions = versions
+
+            return changed
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections or ():
+                connection.close()
+            self._connections = None
+
+    @staticmethod
+    def _data_version(connection) -> int:
+        cursor = connection.cursor()
+
+        try:
+            cursor.execute("PRAGMA data_version")
+            return cursor.fetchone()[0]
+
+        finally:
+            cursor.close()
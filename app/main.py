@@ -1,17 +1,47 @@
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
-from app.api import accounts, auth, lines
+from app.api import accounts, audits, auth, jobs, lines, number_pools
+from app.core.bloom import msisdn_filter
+from app.core.cache import read_cache
 from app.core.config import settings
 from app.core.exceptions import AppException
+from app.core.jobs import JobManager
 from app.core.logging import get_logger, setup_logging
+from app.core.security import PasswordHasher, token_cache
+from app.core.tasks import PeriodicTask
 from app.db.base import Base
-from app.db.init_db import init_db
-from app.db.session import SessionLocal, engine
+from app.db.init_db import (
+    add_missing_columns,
+    backfill_msisdn_keys,
+    create_indexes,
+    create_search_index,
+    init_db,
+)
+from app.db.session import (
+    SessionLocal,
+    async_engine,
+    async_shard_engines,
+    engine,
+    shard_engines,
+)
+from app.db.sharding import SHARDED_TABLES, run_shard_key_sweep
+from app.db.sqlite import DataVersionProbe, lock_metrics
+from app.services.audit_archive import audit_archive, run_audit_retention
+from app.services.audit_service import (
+    audit_writer_stats,
+    start_audit_writer,
+    stop_audit_writer,
+)
+from app.services.auth_service import run_refresh_token_sweep
+from app.services.idempotency_service import run_idempotency_key_sweep
+from app.services.line_service import warm_msisdn_filter
+from app.services.number_pool_service import number_allocator
 
 logger = get_logger()
 
@@ -23,6 +53,17 @@ async def lifespan(app: FastAPI):
 
     try:
         Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
+        create_indexes(engine)
+        create_search_index(engine)
+        backfill_msisdn_keys(engine)
+
+        for shard_engine in shard_engines.values():
+            Base.metadata.create_all(bind=shard_engine, tables=SHARDED_TABLES)
+            add_missing_columns(shard_engine, SHARDED_TABLES)
+            create_indexes(shard_engine, SHARDED_TABLES)
+            create_search_index(shard_engine)
+            backfill_msisdn_keys(shard_engine)
 
         if settings.DEV:
             init_db()
@@ -34,9 +75,103 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error during database initialization: {e}")
 
+    if settings.MSISDN_FILTER_CAPACITY > 0:
+        try:
+            count = warm_msisdn_filter(SessionLocal)
+            logger.info(f"MSISDN filter loaded with {count} lines")
+
+        except Exception as e:
+            logger.error(f"MSISDN filter not loaded; every new line gets a duplicate check: {e}")
+
+    if settings.AUDIT_SINK == "batched":
+        start_audit_writer(SessionLocal)
+
+    password_hasher = PasswordHasher(
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.LOGIN_MAX_PENDING,
+        retry_after=settings.LOGIN_RETRY_AFTER_SECONDS,
+    )
+    password_hasher.start()
+    app.state.password_hasher = password_hasher
+
+    job_manager = JobManager(
+        workers=settings.JOB_WORKERS,
+        max_queue=settings.JOB_QUEUE_MAXSIZE,
+        max_history=settings.JOB_HISTORY_SIZE,
+    )
+    await job_manager.start()
+    app.state.jobs = job_manager
+
+    maintenance: list[PeriodicTask] = []
+    if settings.AUDIT_RETENTION_DAYS > 0:
+        maintenance.append(
+            PeriodicTask(
+                "audit-retention",
+                settings.AUDIT_ARCHIVE_INTERVAL_SECONDS,
+                partial(run_audit_retention, SessionLocal, audit_archive),
+            )
+        )
+
+    if settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+        maintenance.append(
+            PeriodicTask(
+                "refresh-token-sweep",
+                settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS,
+                partial(run_refresh_token_sweep, SessionLocal),
+            )
+        )
+
+    if settings.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS > 0:
+        maintenance.append(
+            PeriodicTask(
+                "idempotency-key-sweep",
+                settings.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS,
+                partial(run_idempotency_key_sweep, SessionLocal),
+            )
+        )
+
+    if shard_engines and settings.SHARD_KEY_SWEEP_INTERVAL_SECONDS > 0:
+        maintenance.append(
+            PeriodicTask(
+                "shard-key-sweep",
+                settings.SHARD_KEY_SWEEP_INTERVAL_SECONDS,
+                partial(run_shard_key_sweep, SessionLocal),
+            )
+        )
+
+    for task in maintenance:
+        await task.start()
+
+    # Accounts and lines live on the shards when sharding is enabled
+    data_versions = None
+    if settings.READ_CACHE_POLL_INTERVAL_MS > 0:
+        data_versions = DataVersionProbe(shard_engines.values() or [engine])
+        read_cache.watch(data_versions.changed)
+
     yield  # The app stays here while running
     logger.info("Shutting down backend services...")
 
+    for task in maintenance:
+        await task.stop()
+
+    if data_versions is not None:
+        read_cache.watch(None)
+        data_versions.close()
+
+    # Let in-flight commissioning finish before the process exits
+    await job_manager.shutdown(timeout=settings.JOB_SHUTDOWN_TIMEOUT_SECONDS)
+
+    # Flush queued audit entries (including those from drained jobs)
+    stop_audit_writer()
+
+    password_hasher.shutdown()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    for async_shard_engine in async_shard_engines.values():
+        await async_shard_engine.dispose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -52,6 +187,7 @@ async def app_exception_handler(request: Request, exc: AppException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.__class__.__name__, "message": exc.detail},
+        headers=exc.headers,
     )
 
 
@@ -76,6 +212,9 @@ async def global_exception_handler(request: Request, exc: Exception):
 app.include_router(auth.router)
 app.include_router(accounts.router)
 app.include_router(lines.router)
+app.include_router(number_pools.router)
+app.include_router(jobs.router)
+app.include_router(audits.router)
 
 
 @app.get("/", tags=["System"])
@@ -99,3 +238,23 @@ def health_check():
         return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=health_status)
 
     return health_status
+
+
+@app.get("/metrics", tags=["System"])
+def metrics(request: Request):
+    return {
+        "token_cache": token_cache.stats(),
+        "read_cache": read_cache.stats(),
+        "msisdn_filter": msisdn_filter.stats(),
+        "number_allocator": number_allocator.stats(),
+        "password_hasher": request.app.state.password_hasher.stats(),
+        "audit_writer": audit_writer_stats(),
+        "database": {
+            "locks": lock_metrics.stats(),
+            "pool": {
+                "size": engine.pool.size(),  # type: ignore[attr-defined]
+                "checked_out": engine.pool.checkedout(),  # type: ignore[attr-defined]
+                "overflow": engine.pool.overflow(),  # type: ignore[attr-defined]
+            },
+        },
+    }
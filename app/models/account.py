@@ -1,8 +1,20 @@
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Enum, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (
+    DDL,
+    DateTime,
+    Enum,
+    Float,
+    Index,
+    Integer,
+    String,
+    column,
+    event,
+    literal_column,
+    table,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 from app.schemas.account import AccountStatus
@@ -10,6 +22,12 @@ from app.schemas.account import AccountStatus
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_accounts_created_at_id", "created_at", "id"),
+    )
+    # Read the new version back with RETURNING instead of expiring it after each flush
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     full_name: Mapped[str] = mapped_column(String, nullable=False)
@@ -18,6 +36,69 @@ class Account(Base):
     status: Mapped[AccountStatus] = mapped_column(
         Enum(AccountStatus), nullable=False, default=AccountStatus.ACTIVE
     )
+    # Row version, bumped by every UPDATE (ORM or bulk); ETags are derived from it
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+
+    # Only ever loaded eagerly (selectinload); touching it unloaded raises instead of
+    # quietly issuing one query per account
+    lines: Mapped[list["Line"]] = relationship(  # noqa: F821
+        order_by="(Line.created_at, Line.id)", lazy="raise", viewonly=True
+    )
+
+
+# Full-text index over the searchable columns. An external-content FTS5 table reads the
+# text from `accounts` itself and is matched to it by rowid; the triggers keep it in
+# step with every write, ORM or not. VACUUM renumbers rowids, so rebuild it after one:
+#   INSERT INTO accounts_fts(accounts_fts) VALUES ('rebuild')
+ACCOUNT_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5(
+        full_name, email, phone,
+        content='accounts', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_ai AFTER INSERT ON accounts BEGIN
+        INSERT INTO accounts_fts (rowid, full_name, email, phone)
+        VALUES (new.rowid, new.full_name, new.email, new.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_ad AFTER DELETE ON accounts BEGIN
+        INSERT INTO accounts_fts (accounts_fts, rowid, full_name, email, phone)
+        VALUES ('delete', old.rowid, old.full_name, old.email, old.phone);
+    END
+    """,
+    # Status and version changes leave the index alone
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_au
+    AFTER UPDATE OF full_name, email, phone ON accounts BEGIN
+        INSERT INTO accounts_fts (accounts_fts, rowid, full_name, email, phone)
+        VALUES ('delete', old.rowid, old.full_name, old.email, old.phone);
+        INSERT INTO accounts_fts (rowid, full_name, email, phone)
+        VALUES (new.rowid, new.full_name, new.email, new.phone);
+    END
+    """,
+)
+
+for _statement in ACCOUNT_SEARCH_DDL:
+    event.listen(Account.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Account.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS accounts_fts").execute_if(dialect="sqlite"),
+)
+
+# For queries; `rank` is the bm25 score of a MATCH (lower is better)
+accounts_fts = table("accounts_fts", column("rowid", Integer), column("rank", Float))
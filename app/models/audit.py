@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, DateTime, String
+from sqlalchemy import JSON, DateTime, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -9,6 +9,14 @@ from app.db.base import Base
 
 class Audit(Base):
     __tablename__ = "audits"
+    __table_args__ = (
+        # Each filter of the audit API is served by an index ending in the
+        # (created_at, id) keyset order
+        Index("ix_audits_created_at_id", "created_at", "id"),
+        Index("ix_audits_resource", "resource_type", "resource_id", "created_at", "id"),
+        Index("ix_audits_actor", "actor", "created_at", "id"),
+        Index("ix_audits_action", "action", "created_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     actor: Mapped[str] = mapped_column(String, nullable=True)
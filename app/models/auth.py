@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy import DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -9,6 +9,12 @@ from app.db.base import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Sessions of a user (revocation)
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        # Expired/revoked token cleanup
+        Index("ix_refresh_tokens_revoked_expires_at", "revoked", "expires_at"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
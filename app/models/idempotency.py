@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """The first response to a request sent with an `Idempotency-Key`, kept in the main database."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Expired key cleanup
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+        # Rows are looked up by their (actor, key) primary key only; no rowid to store twice
+        {"sqlite_with_rowid": False},
+    )
+
+    actor: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    # Digest of the method, path and body; a key cannot be reused for another request
+    fingerprint: Mapped[bytes] = mapped_column(LargeBinary(16), nullable=False)
+    # Both NULL while the first request is still running
+    status_code: Mapped[Optional[int]] = mapped_column(Integer)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -1,7 +1,16 @@
 from datetime import datetime, timezone
+from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    literal_column,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -10,14 +19,32 @@ from app.schemas.line import LineStatus
 
 class Line(Base):
     __tablename__ = "lines"
+    __table_args__ = (
+        # Lines of an account in keyset pagination order
+        Index("ix_lines_account_id_created_at_id", "account_id", "created_at", "id"),
+        # Bulk status changes by plan
+        Index("ix_lines_plan_name", "plan_name"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     account_id: Mapped[UUID] = mapped_column(ForeignKey("accounts.id"), nullable=False)
     msisdn: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    # E.164 form of `msisdn`, what lookups and duplicate checks go by; NULL only on rows
+    # written before it existed whose MSISDN does not normalize
+    msisdn_e164: Mapped[Optional[str]] = mapped_column(String, unique=True, index=True)
     plan_name: Mapped[str] = mapped_column(String, nullable=False)
     status: Mapped[LineStatus] = mapped_column(
         Enum(LineStatus), nullable=False, default=LineStatus.PROVISIONED
     )
+    # Also bumped by bulk status UPDATEs, which never load the rows
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class NumberPool(Base):
+    """A range of MSISDNs that lines can be allocated from, kept in the main database."""
+
+    __tablename__ = "number_pools"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_number_pools_created_at_id", "created_at", "id"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
+    name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    # E.164 digits as integers, both ends included
+    range_start: Mapped[int] = mapped_column(BigInteger, index=True, nullable=False)
+    range_end: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # First number not yet reserved by a worker; every number before it has been handed
+    # to one (and may be unused if that worker stopped), so it only ever moves forward
+    next_number: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    @property
+    def size(self) -> int:
+        return self.range_end - self.range_start + 1
+
+    @property
+    def reserved(self) -> int:
+        return min(self.next_number, self.range_end + 1) - self.range_start
@@ -0,0 +1,14 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ShardKey(Base):
+    """Routing index kept in the global database: which shard owns a unique key."""
+
+    __tablename__ = "shard_keys"
+
+    kind: Mapped[str] = mapped_column(String, primary_key=True)  # "email" or "msisdn"
+    value: Mapped[str] = mapped_column(String, primary_key=True)
+    shard: Mapped[str] = mapped_column(String, nullable=False)
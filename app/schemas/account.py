@@ -1,10 +1,12 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from app.schemas.line import LineResponse
+
 
 class AccountStatus(str, Enum):
     ACTIVE = "ACTIVE"
@@ -34,4 +36,9 @@ class AccountResponse(BaseModel):
     email: str
     phone: str
     status: AccountStatus
+    version: int
     created_at: datetime
+
+
+class AccountWithLinesResponse(AccountResponse):
+    lines: List[LineResponse]
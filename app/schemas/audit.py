@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AuditFilter(BaseModel):
+    actor: Optional[str] = None
+    action: Optional[str] = None
+    resource_type: Optional[str] = None
+    resource_id: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class AuditResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    actor: Optional[str] = None
+    action: str
+    resource_type: str
+    resource_id: Optional[str] = None
+    old: Optional[dict[str, Any]] = None
+    new: Optional[dict[str, Any]] = None
+    created_at: datetime
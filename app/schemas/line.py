@@ -1,8 +1,12 @@
 from datetime import datetime
 from enum import Enum
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+
+from app.core.msisdn import normalize_msisdn
 
 
 class LineStatus(str, Enum):
@@ -16,11 +20,51 @@ class LineCreate(BaseModel):
     msisdn: str
     plan_name: str
 
+    @field_validator("msisdn")
+    @classmethod
+    def msisdn_normalizes(cls, value: str) -> str:
+        try:
+            normalize_msisdn(value)
+        except ValueError as exc:
+            raise PydanticCustomError("msisdn", str(exc)) from exc
+
+        return value
+
+
+class LineAllocate(BaseModel):
+    pool_id: UUID
+    plan_name: str
+
 
 class LineUpdateStatus(BaseModel):
     status: LineStatus
 
 
+class LineBulkStatusUpdate(BaseModel):
+    """Move every line matching all of the given selectors to `status`."""
+
+    status: LineStatus
+    line_ids: Optional[List[UUID]] = Field(None, min_length=1)
+    account_id: Optional[UUID] = None
+    plan_name: Optional[str] = None
+    current_status: Optional[LineStatus] = None
+
+    @model_validator(mode="after")
+    def has_selector(self) -> "LineBulkStatusUpdate":
+        if self.line_ids is self.account_id is self.plan_name is self.current_status is None:
+            raise PydanticCustomError(
+                "selector", "Select lines by line_ids, account_id, plan_name or current_status"
+            )
+        return self
+
+
+class LineBulkStatusResult(BaseModel):
+    status: LineStatus
+    matched: int
+    updated: int
+    skipped: int  # matched lines whose current status cannot move to `status`
+
+
 class LineResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -29,4 +73,41 @@ class LineResponse(BaseModel):
     msisdn: str
     plan_name: str
     status: LineStatus
+    version: int
     created_at: datetime
+
+
+class LineBatchCommission(BaseModel):
+    line_ids: List[UUID] = Field(min_length=1)
+
+
+class LineCommissionResult(BaseModel):
+    line_id: UUID
+    success: bool
+    status: Optional[LineStatus] = None
+    error: Optional[str] = None
+
+
+class LineBatchCommissionResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[LineCommissionResult]
+
+
+class LineBulkCreate(BaseModel):
+    lines: List[LineCreate] = Field(min_length=1)
+
+
+class LineBulkCreateItem(BaseModel):
+    msisdn: str
+    success: bool
+    line: Optional[LineResponse] = None
+    error: Optional[str] = None
+
+
+class LineBulkCreateResult(BaseModel):
+    total: int
+    created: int
+    conflicts: int
+    results: List[LineBulkCreateItem]
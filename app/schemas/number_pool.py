@@ -0,0 +1,44 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+
+from app.core.msisdn import normalize_msisdn
+
+
+class NumberPoolCreate(BaseModel):
+    name: str = Field(min_length=1)
+    range_start: str  # MSISDNs, in any spelling normalize_msisdn accepts
+    range_end: str
+
+    @field_validator("range_start", "range_end")
+    @classmethod
+    def msisdn_normalizes(cls, value: str) -> str:
+        try:
+            return normalize_msisdn(value)
+        except ValueError as exc:
+            raise PydanticCustomError("msisdn", str(exc)) from exc
+
+    @model_validator(mode="after")
+    def range_is_ordered(self) -> "NumberPoolCreate":
+        if int(self.range_start) > int(self.range_end):
+            raise PydanticCustomError("range", "range_start is after range_end")
+        return self
+
+
+class NumberPoolResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    range_start: str
+    range_end: str
+    size: int
+    reserved: int  # numbers handed out to workers so far, used or not
+    created_at: datetime
+
+    @field_validator("range_start", "range_end", mode="before")
+    @classmethod
+    def as_e164(cls, value: int | str) -> str:
+        return f"+{value}" if isinstance(value, int) else value
@@ -1,16 +1,36 @@
+import re
+from itertools import batched
+from typing import Iterator
 from uuid import UUID
 
+from sqlalchemy import literal_column, text
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
-from app.core.exceptions import ConflictException, NotFoundException
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import read_cache
+from app.core.exceptions import (
+    BadRequestException,
+    ConflictException,
+    NotFoundException,
+)
 from app.core.logging import get_logger
-from app.models.account import Account
-from app.schemas.account import AccountCreate, AccountResponse, AccountUpdate
+from app.core.pagination import paginate
+from app.core.state import ACCOUNT_CASCADE
+from app.models.account import Account, accounts_fts
+from app.models.line import Line
+from app.schemas.account import (
+    AccountCreate,
+    AccountResponse,
+    AccountUpdate,
+    AccountWithLinesResponse,
+)
 from app.services.audit_service import record_audit
+from app.services.line_service import move_lines
 
 logger = get_logger()
 
+SEARCH_TERM = re.compile(r"\w+")
+
 
 def create_account(db: Session, account_data: AccountCreate, actor: dict | str | None = None):
     account = Account(
@@ -40,8 +60,58 @@ def create_account(db: Session, account_data: AccountCreate, actor: dict | str |
     return account
 
 
-def get_accounts(db: Session, limit: int = 100):
-    return db.query(Account).limit(limit).all()
+def get_accounts(db: Session, limit: int = 100, cursor: str | None = None):
+    return paginate(db.query(Account), (Account.created_at, Account.id), limit, cursor)
+
+
+def get_accounts_with_lines(db: Session, limit: int = 100, cursor: str | None = None):
+    """Like `get_accounts`, with the lines of the whole page loaded by one extra IN query."""
+    query = db.query(Account).options(selectinload(Account.lines))
+    return paginate(query, (Account.created_at, Account.id), limit, cursor)
+
+
+def search_accounts(db: Session, q: str, limit: int = 100, cursor: str | None = None):
+    """
+    Accounts whose name, email or phone has words starting with every term of `q`, best
+    match (bm25) first.
+
+    Terms are taken as word prefixes, so "jo doe" finds "John Doe" and "0712" finds
+    "0712 345678" (but not "+254712345678", a single word).
+    Pages are keyed on (rank, id).
+    """
+    terms = SEARCH_TERM.findall(q)
+    if not terms:
+        raise BadRequestException(detail="Search query has no searchable terms")
+
+    query = (
+        # `id` repeated as a column so that paginate can read both keys off each row
+        db.query(Account, accounts_fts.c.rank, Account.id)
+        .join(accounts_fts, accounts_fts.c.rowid == literal_column("accounts.rowid"))
+        .filter(text("accounts_fts MATCH :match"))
+        .params(match=" ".join(f'"{term}"*' for term in terms))
+    )
+    rows, next_cursor = paginate(query, (accounts_fts.c.rank, Account.id), limit, cursor)
+
+    return [row.Account for row in rows], next_cursor
+
+
+def export_accounts(
+    db: Session, batch_size: int, include_lines: bool = False
+) -> Iterator[tuple[Account, ...]]:
+    """Yield every account in page order, in batches fetched from the database as consumed."""
+    query = db.query(Account).order_by(Account.created_at, Account.id)
+
+    if include_lines:
+        # With yield_per, lines are selected per batch of accounts
+        query = query.options(selectinload(Account.lines))
+
+    yield from batched(query.yield_per(batch_size), batch_size)
+
+
+def get_account_page_versions(db: Session, limit: int = 100, cursor: str | None = None):
+    """The `(id, version)` rows of an accounts page, without loading the accounts."""
+    query = db.query(Account.id, Account.version, Account.created_at)
+    return paginate(query, (Account.created_at, Account.id), limit, cursor)
 
 
 def get_account_by_id(db: Session, account_id: UUID):
@@ -53,6 +123,41 @@ def get_account_by_id(db: Session, account_id: UUID):
     return account
 
 
+def get_account_version(db: Session, account_id: UUID) -> int:
+    version = db.query(Account.version).filter(Account.id == account_id).scalar()
+
+    if version is None:
+        raise NotFoundException(detail="Account not found")
+
+    return version
+
+
+def get_account_cached(db: Session, account_id: UUID) -> AccountResponse:
+    return read_cache.get_or_load(
+        account_id,
+        "account",
+        lambda: AccountResponse.model_validate(get_account_by_id(db, account_id)),
+    )
+
+
+def get_account_with_lines_cached(db: Session, account_id: UUID) -> AccountWithLinesResponse:
+    def load():
+        account = (
+            db.query(Account)
+            .options(selectinload(Account.lines))
+            .filter(Account.id == account_id)
+            .first()
+        )
+
+        if not account:
+            raise NotFoundException(detail="Account not found")
+
+        return AccountWithLinesResponse.model_validate(account)
+
+    # Line changes invalidate the account's entries too, so this stays in step with them
+    return read_cache.get_or_load(account_id, "account+lines", load)
+
+
 def update_account(
     db: Session, account_id: UUID, account_data: AccountUpdate, actor: dict | str | None = None
 ):
@@ -63,14 +168,34 @@ def update_account(
     except Exception:
         old = None
 
+    previous_status = account.status
     for field, value in account_data.model_dump(exclude_unset=True).items():
         setattr(account, field, value)
 
-    db.commit()
-    db.refresh(account)
+    cascade = ACCOUNT_CASCADE.get(account.status) if account.status != previous_status else None
+    moved = []
 
+    try:
+        db.flush()
+
+        # The lines follow the account in the same transaction, with one UPDATE
+        if cascade:
+            target, sources = cascade
+            selected = [Line.account_id == account.id, Line.status.in_(sources)]
+            _, moved = move_lines(db, selected, target, actor=actor, action="cascade_line_status")
+
+        db.commit()
+        db.refresh(account)
+    except IntegrityError as exc:
+        db.rollback()
+        raise ConflictException(detail="Account with this email already exists") from exc
+
+    read_cache.invalidate(account.id)
     logger.info(f"Account updated: {account.id}")
 
+    if moved:
+        logger.info(f"Account {account.id} {account.status.value}: {len(moved)} lines moved")
+
     try:
         new = AccountResponse.model_validate(account).model_dump()
         record_audit(db, actor, "update_account", "account", str(account.id), old=old, new=new)
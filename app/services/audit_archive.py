@@ -0,0 +1,344 @@
+import gzip
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.audit import Audit
+from app.schemas.audit import AuditFilter, AuditResponse
+
+logger = get_logger()
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+INDEX_SUFFIX = ".idx.json"
+# Replaced after every new segment; readers reload their indexes when it changes
+MANIFEST_NAME = "manifest"
+
+AuditKey = tuple[datetime, UUID]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Stored timestamps come back from SQLite as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _key(audit: AuditResponse) -> AuditKey:
+    return (_naive_utc(audit.created_at), audit.id)
+
+
+@dataclass
+class SegmentIndex:
+    """Sidecar summary of one segment, used to skip segments that cannot match a query."""
+
+    path: Path
+    day: date
+    count: int
+    first: AuditKey
+    last: AuditKey
+    actors: set[str]
+    actions: set[str]
+    resource_types: set[str]
+
+    def to_json(self) -> dict:
+        return {
+            "segment": self.path.name,
+            "day": self.day.isoformat(),
+            "count": self.count,
+            "first": [self.first[0].isoformat(), self.first[1].hex],
+            "last": [self.last[0].isoformat(), self.last[1].hex],
+            "actors": sorted(self.actors),
+            "actions": sorted(self.actions),
+            "resource_types": sorted(self.resource_types),
+        }
+
+    @classmethod
+    def from_json(cls, directory: Path, data: dict) -> "SegmentIndex":
+        return cls(
+            path=directory / data["segment"],
+            day=date.fromisoformat(data["day"]),
+            count=data["count"],
+            first=(datetime.fromisoformat(data["first"][0]), UUID(data["first"][1])),
+            last=(datetime.fromisoformat(data["last"][0]), UUID(data["last"][1])),
+            actors=set(data["actors"]),
+            actions=set(data["actions"]),
+            resource_types=set(data["resource_types"]),
+        )
+
+    def may_match(self, filters: AuditFilter, after: AuditKey | None = None) -> bool:
+        if after is not None and self.last <= after:
+            return False
+
+        if filters.actor is not None and filters.actor not in self.actors:
+            return False
+
+        if filters.action is not None and filters.action not in self.actions:
+            return False
+
+        if filters.resource_type is not None and filters.resource_type not in self.resource_types:
+            return False
+
+        if filters.created_from is not None and self.last[0] < _naive_utc(filters.created_from):
+            return False
+
+        if filters.created_to is not None and self.first[0] >= _naive_utc(filters.created_to):
+            return False
+
+        return True
+
+
+def _matches(audit: AuditResponse, filters: AuditFilter) -> bool:
+    created_at = _naive_utc(audit.created_at)
+
+    return (
+        (filters.actor is None or audit.actor == filters.actor)
+        and (filters.action is None or audit.action == filters.action)
+        and (filters.resource_type is None or audit.resource_type == filters.resource_type)
+        and (filters.resource_id is None or audit.resource_id == filters.resource_id)
+        and (filters.created_from is None or created_at >= _naive_utc(filters.created_from))
+        and (filters.created_to is None or created_at < _naive_utc(filters.created_to))
+    )
+
+
+class AuditArchive:
+    """
+    Compressed, date-partitioned store for audits moved out of the live table.
+
+    Layout: `<root>/<YYYY-MM-DD>/<seq>.ndjson.gz`, one gzip NDJSON segment per
+    archival batch and day, sorted by (created_at, id), each with a `<seq>.idx.json`
+    sidecar holding its key range and the distinct actors, actions and resource types.
+    Every new segment also replaces `<root>/manifest`, which tells other processes
+    to reload their indexes.
+    """
+
+    lock_ttl = 6 * 3600.0  # seconds after which an abandoned archival lock is broken
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+        self._lock = threading.Lock()
+        self._segments: list[SegmentIndex] | None = None
+        self._manifest: tuple | None = None
+
+    def segments(self) -> list[SegmentIndex]:
+        with self._lock:
+            manifest = self._manifest_version()
+            if self._segments is None or manifest != self._manifest:
+                self._segments = self._load_indexes()
+                self._manifest = manifest
+
+            return list(self._segments)
+
+    def _manifest_version(self) -> tuple | None:
+        try:
+            stat = (self.root / MANIFEST_NAME).stat()
+        except FileNotFoundError:
+            return None
+
+        # The manifest is replaced, not rewritten, so its inode changes even when two
+        # writes fall within the filesystem's mtime resolution
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def write_segment(self, day: date, audits: list[AuditResponse]) -> SegmentIndex:
+        directory = self.root / day.isoformat()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        seq = len(list(directory.glob(f"*{INDEX_SUFFIX}"))) + 1
+        path = directory / f"{seq:06d}{SEGMENT_SUFFIX}"
+
+        index = SegmentIndex(
+            path=path,
+            day=day,
+            count=len(audits),
+            first=_key(audits[0]),
+            last=_key(audits[-1]),
+            actors={a.actor for a in audits if a.actor is not None},
+            actions={a.action for a in audits},
+            resource_types={a.resource_type for a in audits},
+        )
+
+        # Write to temp files and rename, so readers never see a partial segment
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            for audit in audits:
+                fh.write(audit.model_dump_json() + "\n")
+        os.replace(tmp, path)
+
+        index_path = directory / f"{seq:06d}{INDEX_SUFFIX}"
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        tmp.write_text(json.dumps(index.to_json()), encoding="utf-8")
+        os.replace(tmp, index_path)
+
+        manifest = self.root / MANIFEST_NAME
+        tmp = manifest.with_name(manifest.name + ".tmp")
+        tmp.write_text(f"{index_path.relative_to(self.root)}\n", encoding="utf-8")
+        os.replace(tmp, manifest)
+
+        with self._lock:
+            if self._segments is not None:
+                self._segments.append(index)
+                self._segments.sort(key=lambda s: s.first)
+                self._manifest = self._manifest_version()
+
+        return index
+
+    @contextmanager
+    def lock(self):
+        """Cross-process archival lock; yields False if another process holds it."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / ".lock"
+
+        try:
+            if time.time() - path.stat().st_mtime > self.lock_ttl:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            yield False
+            return
+
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            yield True
+        finally:
+            path.unlink(missing_ok=True)
+
+    def read_segment(self, segment: SegmentIndex) -> Iterator[AuditResponse]:
+        with gzip.open(segment.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                yield AuditResponse.model_validate_json(line)
+
+    def search(
+        self, filters: AuditFilter, after: AuditKey | None = None, limit: int = 100
+    ) -> list[AuditResponse]:
+        """Return up to `limit` archived audits matching `filters` with a key after `after`."""
+        found: list[AuditResponse] = []
+
+        for segment in self.segments():
+            # Segments are ordered by first key: once we have enough rows that all
+            # sort before this segment, no later segment can contribute
+            if len(found) >= limit and _key(found[-1]) < segment.first:
+                break
+
+            if not segment.may_match(filters, after):
+                continue
+
+            # Rows within a segment are sorted too, so reading stops at the first row
+            # that sorts after everything already kept
+            bound = _key(found[-1]) if len(found) >= limit else None
+            matches = []
+            for audit in self.read_segment(segment):
+                key = _key(audit)
+                if after is not None and key <= after:
+                    continue
+
+                if (bound is not None and key > bound) or len(matches) >= limit:
+                    break
+
+                if _matches(audit, filters):
+                    matches.append(audit)
+
+            found = list(islice(heapq.merge(found, matches, key=_key), limit))
+
+        return found
+
+    def export(self, filters: AuditFilter) -> Iterator[AuditResponse]:
+        for segment in self.segments():
+            if segment.may_match(filters):
+                yield from (a for a in self.read_segment(segment) if _matches(a, filters))
+
+    def _load_indexes(self) -> list[SegmentIndex]:
+        if not self.root.exists():
+            return []
+
+        segments = []
+        for index_path in self.root.glob(f"*/*{INDEX_SUFFIX}"):
+            try:
+                data = json.loads(index_path.read_text(encoding="utf-8"))
+                segments.append(SegmentIndex.from_json(index_path.parent, data))
+            except (OSError, ValueError, KeyError):
+                logger.error(f"Skipping unreadable audit segment index: {index_path}")
+
+        return sorted(segments, key=lambda s: s.first)
+
+
+audit_archive = AuditArchive(settings.AUDIT_ARCHIVE_DIR)
+
+
+def get_audit_archive() -> AuditArchive:
+    return audit_archive
+
+
+def archive_audits(db: Session, archive: AuditArchive, retention_days: int, batch_size: int) -> int:
+    """
+    Move audits older than `retention_days` (whole UTC days) into the archive.
+
+    Rows are written to a segment before they are deleted, so a crash between the
+    two steps can duplicate a batch in the archive but never lose it.
+    """
+    cutoff = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - timedelta(days=retention_days)
+
+    with archive.lock() as acquired:
+        if not acquired:
+            logger.info("Audit archival already running in another process; skipping")
+            return 0
+
+        total = _archive_before(db, archive, cutoff, batch_size)
+
+    if total:
+        logger.info(f"Archived {total} audit entries older than {cutoff.date()}")
+
+    return total
+
+
+def _archive_before(db: Session, archive: AuditArchive, cutoff: datetime, batch_size: int) -> int:
+    total = 0
+    while True:
+        rows = (
+            db.query(Audit)
+            .filter(Audit.created_at < cutoff)
+            .order_by(Audit.created_at, Audit.id)
+            .limit(batch_size)
+            .all()
+        )
+
+        if not rows:
+            break
+
+        audits = [AuditResponse.model_validate(row) for row in rows]
+        for day, group in groupby(audits, key=lambda a: a.created_at.date()):
+            archive.write_segment(day, list(group))
+
+        db.query(Audit).filter(Audit.id.in_([row.id for row in rows])).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.expunge_all()
+
+        total += len(rows)
+
+    return total
+
+
+def run_audit_retention(session_factory, archive: AuditArchive) -> int:
+    with session_factory() as db:
+        return archive_audits(
+            db, archive, settings.AUDIT_RETENTION_DAYS, settings.AUDIT_ARCHIVE_BATCH_SIZE
+        )
@@ -1,15 +1,26 @@
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from enum import Enum
-from typing import Any
-from uuid import UUID
+from itertools import batched
+from typing import Any, Callable, Iterator
+from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.pagination import decode_cursor, encode_cursor, paginate
 from app.models.audit import Audit
+from app.schemas.audit import AuditFilter, AuditResponse
+from app.services.audit_archive import AuditArchive
+from app.services.audit_writer import AuditWriter
 
 logger = get_logger()
 
+AUDIT_KEY = (Audit.created_at, Audit.id)
+
+# Active write-behind sink, when AUDIT_SINK is "batched"
+_writer: AuditWriter | None = None
+
 
 def _sanitize(value: Any) -> Any:
     """Recursively convert common non-JSON types to JSON-serializable forms.
@@ -48,25 +59,17 @@ def _sanitize(value: Any) -> Any:
         return None
 
 
-def record_audit(
-    db: Session,
+def build_audit(
     actor: dict | str | None,
     action: str,
     resource_type: str,
     resource_id: str | None = None,
     old: dict | None = None,
     new: dict | None = None,
-):
-    actor_name = None
-
-    if isinstance(actor, dict):
-        actor_name = actor.get("username")
-
-    elif isinstance(actor, str):
-        actor_name = actor
-
-    entry = Audit(
-        actor=actor_name,
+) -> Audit:
+    """Build an unsaved audit entry, for callers that persist audits in bulk."""
+    return Audit(
+        actor=_actor_name(actor),
         action=action,
         resource_type=resource_type,
         resource_id=str(resource_id) if resource_id is not None else None,
@@ -74,9 +77,164 @@ def record_audit(
         new=_sanitize(new),
     )
 
+
+def build_audit_row(
+    actor: dict | str | None,
+    action: str,
+    resource_type: str,
+    resource_id: str | None = None,
+    old: dict | None = None,
+    new: dict | None = None,
+) -> dict:
+    """Like `build_audit`, as a complete row for a bulk INSERT of many thousands."""
+    return {
+        "id": uuid4(),
+        "actor": _actor_name(actor),
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": str(resource_id) if resource_id is not None else None,
+        "old": _sanitize(old),
+        "new": _sanitize(new),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _actor_name(actor: dict | str | None) -> str | None:
+    if isinstance(actor, dict):
+        return actor.get("username")
+
+    if isinstance(actor, str):
+        return actor
+
+    return None
+
+
+def record_audit(
+    db: Session,
+    actor: dict | str | None,
+    action: str,
+    resource_type: str,
+    resource_id: str | None = None,
+    old: dict | None = None,
+    new: dict | None = None,
+):
+    entry = build_audit(actor, action, resource_type, resource_id, old=old, new=new)
+
+    if _writer is not None:
+        entry.id = uuid4()
+        entry.created_at = datetime.now(timezone.utc)
+
+        row = {column.key: getattr(entry, column.key) for column in Audit.__table__.columns}
+        if _writer.enqueue(row):
+            return entry
+
+        # Queue is saturated: fall back to writing on the caller's session
+        logger.warning("Audit queue full; writing audit synchronously")
+
     db.add(entry)
     db.commit()
-    db.refresh(entry)
 
-    logger.info(f"Audit recorded: {action} {resource_type}/{resource_id} by {actor_name}")
+    logger.info(f"Audit recorded: {action} {resource_type}/{resource_id} by {entry.actor}")
     return entry
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as UTC; naive filter values are taken to be UTC as well
+    return value.astimezone(timezone.utc) if value.tzinfo else value
+
+
+def _filter_audits(query: Query, filters: AuditFilter) -> Query:
+    if filters.actor is not None:
+        query = query.filter(Audit.actor == filters.actor)
+
+    if filters.action is not None:
+        query = query.filter(Audit.action == filters.action)
+
+    if filters.resource_type is not None:
+        query = query.filter(Audit.resource_type == filters.resource_type)
+
+    if filters.resource_id is not None:
+        query = query.filter(Audit.resource_id == filters.resource_id)
+
+    if filters.created_from is not None:
+        query = query.filter(Audit.created_at >= _as_utc(filters.created_from))
+
+    if filters.created_to is not None:
+        query = query.filter(Audit.created_at < _as_utc(filters.created_to))
+
+    return query
+
+
+def get_audits(
+    db: Session,
+    filters: AuditFilter,
+    limit: int = 100,
+    cursor: str | None = None,
+    archive: AuditArchive | None = None,
+):
+    query = _filter_audits(db.query(Audit), filters)
+    audits, next_cursor = paginate(query, AUDIT_KEY, limit, cursor)
+
+    if archive is None:
+        return audits, next_cursor
+
+    # Merge archived entries into the same (created_at, id) order as live ones
+    after = tuple(decode_cursor(cursor, AUDIT_KEY)) if cursor else None
+    archived = archive.search(filters, after, limit + 1)  # type: ignore[arg-type]
+
+    merged = sorted(
+        archived + [AuditResponse.model_validate(a) for a in audits],
+        key=lambda a: (a.created_at, a.id),
+    )
+
+    has_more = next_cursor is not None or len(merged) > limit
+    merged = merged[:limit]
+
+    if has_more and merged:
+        return merged, encode_cursor([merged[-1].created_at, merged[-1].id])
+
+    return merged, None
+
+
+def export_audits(
+    db: Session, filters: AuditFilter, batch_size: int, archive: AuditArchive | None = None
+) -> Iterator[tuple[Audit | AuditResponse, ...]]:
+    """Yield matching audits in batches, streaming rows from the database as they are consumed."""
+    if archive is not None:
+        yield from batched(archive.export(filters), batch_size)
+
+    query = (
+        _filter_audits(db.query(Audit), filters)
+        .order_by(Audit.created_at, Audit.id)
+        .yield_per(batch_size)
+    )
+
+    yield from batched(query, batch_size)
+
+
+def start_audit_writer(session_factory: Callable[[], Session]) -> AuditWriter:
+    global _writer
+
+    writer = AuditWriter(
+        session_factory,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+        max_queue=settings.AUDIT_QUEUE_MAXSIZE,
+        enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_MS / 1000,
+    )
+    writer.start()
+
+    _writer = writer
+    return writer
+
+
+def audit_writer_stats() -> dict | None:
+    return _writer.stats() if _writer is not None else None
+
+
+def stop_audit_writer():
+    global _writer
+
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
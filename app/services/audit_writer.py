@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.sqlite import retry_on_lock
+from app.models.audit import Audit
+
+logger = get_logger()
+
+
+class AuditWriter:
+    """
+    Write-behind sink for audit entries.
+
+    Entries are queued in memory and written by a background thread with one bulk
+    INSERT every `batch_size` entries or `flush_interval` seconds, whichever comes
+    first. The queue is bounded: producers block for up to `enqueue_timeout` seconds
+    when it is full, and `enqueue` returns False if there is still no room.
+
+    A batch that cannot be written (after lock retries) is written again one entry at
+    a time, so one bad row does not take the rest with it. Entries that still fail are
+    logged and counted as `dropped`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        enqueue_timeout: float,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.written = 0
+        self.fallbacks = 0
+        self.dropped = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+        logger.info(
+            f"Audit writer started (batch={self.batch_size}, interval={self.flush_interval}s)"
+        )
+
+    def enqueue(self, row: dict) -> bool:
+        if self._stopping.is_set():
+            return False
+
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self):
+        """Block until every queued entry has been written."""
+        self._queue.join()
+
+    def stop(self):
+        """Stop accepting entries and write out everything still queued."""
+        self._stopping.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        logger.info("Audit writer stopped")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "fallbacks": self.fallbacks,
+            "dropped": self.dropped,
+        }
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+
+    def _insert(self, batch: list[dict]):
+        with self.session_factory() as db:
+            db.execute(insert(Audit), batch)
+            db.commit()
+
+    def _write(self, batch: list[dict]):
+        try:
+            retry_on_lock(self._insert, batch)
+            self.written += len(batch)
+
+            logger.debug(f"Audit writer flushed {len(batch)} entries")
+
+        except Exception:
+            logger.exception(
+                f"Audit writer failed to persist {len(batch)} entries; writing them one by one"
+            )
+            self.fallbacks += 1
+            self._write_each(batch)
+
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_each(self, batch: list[dict]):
+        for row in batch:
+            try:
+                retry_on_lock(self._insert, [row])
+                self.written += 1
+
+            except Exception:
+                self.dropped += 1
+                logger.exception(
+                    f"Audit entry dropped: {row['action']} "
+                    f"{row['resource_type']}/{row['resource_id']} by {row['actor']}"
+                )
@@ -1,23 +1,44 @@
 from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
+from sqlalchemy import and_, delete, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password
+from app.core.exceptions import NotFoundException, UnauthorizedException
+from app.core.logging import get_logger
+from app.core.security import PasswordHasher, create_access_token
+from app.db.session import DbSession, run_db
 from app.models.auth import RefreshToken
 from app.models.user import User
 from app.schemas.user import UserResponse
 
+logger = get_logger()
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+
+def get_user_by_username(db: Session, username: str):
+    return db.query(User).filter(User.username == username).first()
+
+
+def update_password_hash(db: Session, user: User, password_hash: str):
+    user.password_hash = password_hash
+    db.commit()
+
+
+async def authenticate_user(db: DbSession, hasher: PasswordHasher, username: str, password: str):
+    user = await run_db(db, get_user_by_username, username)
 
     if not user:
         return None
 
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
 
+    # The stored hash predates the current BCRYPT_ROUNDS; upgrade it while we have the password
+    if new_hash is not None:
+        await run_db(db, update_password_hash, user, new_hash)
+
     return user
 
 
@@ -31,15 +52,13 @@ def generate_session(db: Session, user: User):
         minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
     )
     refresh_token = RefreshToken(
+        id=uuid4(),
         user_id=user.id,
         expires_at=refresh_expiry,
     )
 
-    db.add(refresh_token)
-    db.commit()
-    db.refresh(refresh_token)
-
-    return {
+    # Read everything the response needs before commit expires the instances
+    session = {
         "access_token": access_token,
         "refresh_token": str(refresh_token.id),
         "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES,
@@ -47,3 +66,80 @@ def generate_session(db: Session, user: User):
         "token_type": "bearer",
         "user": UserResponse.model_validate(user),
     }
+
+    db.add(refresh_token)
+    db.commit()
+
+    return session
+
+
+def rotate_refresh_token(db: Session, token_id: UUID):
+    """
+    Revoke a live refresh token and open a new session for its owner, in one transaction.
+
+    The revoke is a guarded UPDATE that also returns the owning user, so a token can
+    be rotated at most once even when the same token is presented concurrently.
+    """
+    stmt = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == token_id,
+            RefreshToken.revoked == 0,
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        )
+        .values(revoked=1)
+        .returning(
+            RefreshToken.user_id,
+            select(User.username).where(User.id == RefreshToken.user_id).scalar_subquery(),
+            select(User.role).where(User.id == RefreshToken.user_id).scalar_subquery(),
+        )
+    )
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
+
+    if row is None:
+        # Only the failure path pays for a second lookup, to tell the client why
+        live = (
+            db.query(RefreshToken.id)
+            .filter(RefreshToken.id == token_id, RefreshToken.revoked == 0)
+            .first()
+        )
+        raise UnauthorizedException(
+            detail="Refresh token expired" if live else "Invalid refresh token"
+        )
+
+    user_id, username, role = row
+    if username is None:
+        raise NotFoundException(detail="User not found")
+
+    return generate_session(db, User(id=user_id, username=username, role=role))
+
+
+def purge_refresh_tokens(db: Session, batch_size: int) -> int:
+    """Delete revoked and expired refresh tokens, committing every `batch_size` rows."""
+    dead = or_(
+        RefreshToken.revoked == 1,
+        and_(RefreshToken.revoked == 0, RefreshToken.expires_at < datetime.now(timezone.utc)),
+    )
+
+    total = 0
+    while True:
+        batch = select(RefreshToken.id).where(dead).limit(batch_size)
+        result = db.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(batch)),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+    if total:
+        logger.info(f"Purged {total} revoked or expired refresh tokens")
+
+    return total
+
+
+def run_refresh_token_sweep(session_factory) -> int:
+    with session_factory() as db:
+        return purge_refresh_tokens(db, settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE)
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from sqlalchemy import Row, delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ConflictException
+from app.core.logging import get_logger
+from app.db.session import DbSession, run_db
+from app.models.idempotency import IdempotencyKey
+
+logger = get_logger()
+
+# How often a retry checks whether the first request has finished
+WAIT_POLL_SECONDS = 0.05
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+
+    return digest.digest()
+
+
+def claim_idempotency_key(db: Session, actor: str, key: str, fingerprint: bytes) -> Row | None:
+    """
+    Claim `key` for a request about to run. Returns None if claimed, otherwise the
+    `(fingerprint, status_code, body)` of the request holding it.
+    """
+    # Waiting retries call this repeatedly; they only read until the key is free
+    held = _held_key(db, actor, key)
+    if held is not None:
+        return held
+
+    now = datetime.now(timezone.utc)
+    claim = insert(IdempotencyKey).values(
+        actor=actor,
+        key=key,
+        fingerprint=fingerprint,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+    )
+    # An expired response, or a claim whose request never finished, is taken over
+    claim = claim.on_conflict_do_update(
+        index_elements=[IdempotencyKey.actor, IdempotencyKey.key],
+        set_={
+            "fingerprint": claim.excluded.fingerprint,
+            "status_code": None,
+            "body": None,
+            "expires_at": claim.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at <= now,
+    )
+    claimed = db.execute(claim.returning(IdempotencyKey.key)).first() is not None
+    db.commit()
+
+    if claimed:
+        return None
+
+    # Another request claimed it first
+    return claim_idempotency_key(db, actor, key, fingerprint)
+
+
+def _held_key(db: Session, actor: str, key: str) -> Row | None:
+    return db.execute(
+        select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body).where(
+            IdempotencyKey.actor == actor,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > datetime.now(timezone.utc),
+        )
+    ).first()
+
+
+def save_idempotent_response(db: Session, actor: str, key: str, status_code: int, body: bytes):
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.actor == actor, IdempotencyKey.key == key)
+        .values(
+            status_code=status_code,
+            body=body,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        )
+    )
+    db.commit()
+
+
+def release_idempotency_key(db: Session, actor: str, key: str):
+    """Drop an unfinished claim, so that a retry runs the request again."""
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.actor == actor,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+    db.commit()
+
+
+async def run_idempotent(
+    db: DbSession,
+    request: Request,
+    actor: dict,
+    key: str | None,
+    call: Callable[[], Awaitable[Response]],
+) -> Response:
+    """
+    Run `call` once per `Idempotency-Key` of an actor.
+
+    Its response, if successful, is stored and replayed to every retry of the same
+    request until it expires; retries that arrive while it still runs wait for it.
+    Failed requests release the key, so a retry runs them again.
+    """
+    if key is None:
+        return await call()
+
+    username = actor["username"]
+    fingerprint = request_fingerprint(
+        request.method, request.url.path, request.url.query, await request.body()
+    )
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+    while (held := await run_db(db, claim_idempotency_key, username, key, fingerprint)) is not None:
+        if held.fingerprint != fingerprint:
+            raise ConflictException(detail="Idempotency-Key was already used for another request")
+
+        if held.status_code is not None:
+            return Response(
+                held.body,
+                status_code=held.status_code,
+                media_type="application/json",
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        if time.monotonic() >= deadline:
+            raise ConflictException(detail="A request with this Idempotency-Key is in progress")
+
+        await asyncio.sleep(WAIT_POLL_SECONDS)
+
+    try:
+        response = await call()
+    except BaseException:
+        await run_db(db, release_idempotency_key, username, key)
+        raise
+
+    await run_db(db, save_idempotent_response, username, key, response.status_code, response.body)
+    return response
+
+
+def purge_idempotency_keys(db: Session, batch_size: int) -> int:
+    """Delete expired idempotency keys, committing every `batch_size` rows."""
+    total = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.actor, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+        )
+        # Rows counted off RETURNING, which (unlike rowcount) a sharded session passes on
+        deleted = len(
+            db.execute(
+                delete(IdempotencyKey)
+                .where(tuple_(IdempotencyKey.actor, IdempotencyKey.key).in_(batch))
+                .returning(IdempotencyKey.key),
+                execution_options={"synchronize_session": False},
+            ).all()
+        )
+        db.commit()
+
+        total += deleted
+        if deleted < batch_size:
+            break
+
+    if total:
+        logger.info(f"Purged {total} expired idempotency keys")
+
+    return total
+
+
+def run_idempotency_key_sweep(session_factory) -> int:
+    with session_factory() as db:
+        return purge_idempotency_keys(db, settings.IDEMPOTENCY_SWEEP_BATCH_SIZE)
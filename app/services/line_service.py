@@ -1,20 +1,50 @@
-import time
-from uuid import UUID
-
+import asyncio
+from datetime import datetime, timezone
+from itertools import batched
+from typing import Callable, Iterator
+from uuid import UUID, uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.bloom import msisdn_filter
+from app.core.cache import read_cache
+from app.core.config import settings
 from app.core.exceptions import (
     BadRequestException,
     ConflictException,
     NotFoundException,
 )
+from app.core.jobs import Job, JobManager
 from app.core.logging import get_logger
-from app.core.state import can_transition, is_commissionable
+from app.core.msisdn import normalize_msisdn
+from app.core.pagination import paginate
+from app.core.responses import build_page
+from app.core.state import (
+    ALLOWED_SOURCES,
+    COMMISSIONABLE,
+    can_transition,
+    is_commissionable,
+)
+from app.db.sqlite import retry_on_lock
 from app.models.account import Account
+from app.models.audit import Audit
 from app.models.line import Line
-from app.schemas.line import LineCreate, LineResponse, LineStatus
-from app.services.audit_service import record_audit
+from app.schemas.line import (
+    LineBatchCommissionResult,
+    LineBulkCreateItem,
+    LineBulkCreateResult,
+    LineBulkStatusResult,
+    LineBulkStatusUpdate,
+    LineCommissionResult,
+    LineCreate,
+    LineResponse,
+    LineStatus,
+)
+from app.schemas.pagination import Page
+from app.services.audit_service import build_audit, build_audit_row, record_audit
 
 logger = get_logger()
 
@@ -27,9 +57,16 @@ def create_line(
     if not account:
         raise NotFoundException(detail="Account not found")
 
+    # Turn away a known duplicate with one indexed read rather than a failed INSERT;
+    # the unique index still catches whatever gets past the filter
+    key = normalize_msisdn(line_data.msisdn)
+    if msisdn_filter.might_contain(key) and _msisdn_exists(db, key):
+        raise ConflictException(detail="Line with this MSISDN already exists for the account")
+
     line = Line(
         account_id=account_id,
         msisdn=line_data.msisdn,
+        msisdn_e164=key,
         plan_name=line_data.plan_name,
         status=LineStatus.PROVISIONED,
     )
@@ -45,6 +82,8 @@ def create_line(
             detail="Line with this MSISDN already exists for the account"
         ) from exc
 
+    msisdn_filter.add(key)
+    read_cache.invalidate(account_id)
     logger.info(f"Line created: {line.id} for Account {account_id}")
 
     try:
@@ -56,13 +95,171 @@ def create_line(
     return line
 
 
-def get_lines_by_account(db: Session, account_id: UUID, limit: int = 100):
+def create_lines_bulk(
+    db: Session, account_id: UUID, lines_data: list[LineCreate], actor: dict | str | None = None
+) -> LineBulkCreateResult:
+    if len(lines_data) > settings.LINE_BULK_MAX_SIZE:
+        raise BadRequestException(
+            detail=f"Bulk request exceeds maximum size of {settings.LINE_BULK_MAX_SIZE} lines"
+        )
+
     account = db.query(Account).filter(Account.id == account_id).first()
 
     if not account:
         raise NotFoundException(detail="Account not found")
 
-    return db.query(Line).filter(Line.account_id == account_id).limit(limit).all()
+    # Detect conflicts with existing lines in a single indexed query over every MSISDN.
+    # The filter only knows this process's lines, and one number another worker added
+    # would fail the whole batch at the unique index, so it is not consulted here
+    keys = [normalize_msisdn(line_data.msisdn) for line_data in lines_data]
+    query = db.query(Line.msisdn_e164).filter(Line.msisdn_e164.in_(set(keys)))
+    taken = {key for (key,) in query}
+
+    now = datetime.now(timezone.utc)
+    rows: list[dict] = []
+    results: list[LineBulkCreateItem] = []
+
+    for line_data, key in zip(lines_data, keys):
+        if key in taken:
+            results.append(
+                LineBulkCreateItem(
+                    msisdn=line_data.msisdn, success=False, error="MSISDN already exists"
+                )
+            )
+            continue
+
+        # Later duplicates within the same request conflict with the first occurrence
+        taken.add(key)
+
+        row = {
+            "id": uuid4(),
+            "account_id": account_id,
+            "msisdn": line_data.msisdn,
+            "msisdn_e164": key,
+            "plan_name": line_data.plan_name,
+            "status": LineStatus.PROVISIONED,
+            "version": 1,
+            "created_at": now,
+        }
+        rows.append(row)
+        results.append(
+            LineBulkCreateItem(
+                msisdn=line_data.msisdn, success=True, line=LineResponse.model_validate(row)
+            )
+        )
+
+    if rows:
+        try:
+            db.execute(insert(Line), rows)
+            db.add_all(
+                build_audit(
+                    actor,
+                    "create_line",
+                    "line",
+                    str(item.line.id),
+                    old=None,
+                    new=item.line.model_dump(),
+                )
+                for item in results
+                if item.line is not None
+            )
+            db.commit()
+
+        except IntegrityError as exc:
+            db.rollback()
+            raise ConflictException(
+                detail="MSISDN conflict detected during bulk insert; no lines were created"
+            ) from exc
+
+        for row in rows:
+            msisdn_filter.add(row["msisdn_e164"])
+        read_cache.invalidate(account_id)
+
+    logger.info(f"Bulk line creation for Account {account_id}: {len(rows)}/{len(lines_data)}")
+
+    return LineBulkCreateResult(
+        total=len(lines_data),
+        created=len(rows),
+        conflicts=len(lines_data) - len(rows),
+        results=results,
+    )
+
+
+def _msisdn_exists(db: Session, key: str) -> bool:
+    return db.query(Line.id).filter(Line.msisdn_e164 == key).first() is not None
+
+
+def get_line_by_msisdn(db: Session, msisdn: str):
+    try:
+        key = normalize_msisdn(msisdn)
+    except ValueError as exc:
+        raise BadRequestException(detail=str(exc)) from exc
+
+    line = db.query(Line).filter(Line.msisdn_e164 == key).first()
+
+    if not line:
+        raise NotFoundException(detail="Line not found")
+
+    return line
+
+
+def warm_msisdn_filter(session_factory: Callable[[], Session]) -> int:
+    """Load every line's MSISDN into the existence filter, which is only used after this."""
+    count = 0
+
+    with session_factory() as db:
+        query = db.query(Line.msisdn_e164).filter(Line.msisdn_e164.is_not(None))
+        for (key,) in query.yield_per(settings.STREAM_BATCH_SIZE):
+            msisdn_filter.add(key)
+            count += 1
+
+    msisdn_filter.mark_ready()
+    return count
+
+
+def get_lines_by_account(
+    db: Session, account_id: UUID, limit: int = 100, cursor: str | None = None
+):
+    account = db.query(Account).filter(Account.id == account_id).first()
+
+    if not account:
+        raise NotFoundException(detail="Account not found")
+
+    query = db.query(Line).filter(Line.account_id == account_id)
+    return paginate(query, (Line.created_at, Line.id), limit, cursor)
+
+
+def export_lines_by_account(
+    db: Session, account_id: UUID, batch_size: int
+) -> Iterator[tuple[Line, ...]]:
+    query = (
+        db.query(Line)
+        .filter(Line.account_id == account_id)
+        .order_by(Line.created_at, Line.id)
+        .yield_per(batch_size)
+    )
+    yield from batched(query, batch_size)
+
+
+def get_line_page_versions(
+    db: Session, account_id: UUID, limit: int = 100, cursor: str | None = None
+):
+    """The `(id, version)` rows of an account's lines page, without loading the lines."""
+    if db.query(Account.id).filter(Account.id == account_id).scalar() is None:
+        raise NotFoundException(detail="Account not found")
+
+    query = db.query(Line.id, Line.version, Line.created_at).filter(Line.account_id == account_id)
+    return paginate(query, (Line.created_at, Line.id), limit, cursor)
+
+
+def get_lines_by_account_cached(
+    db: Session, account_id: UUID, limit: int = 100, cursor: str | None = None
+) -> Page[LineResponse]:
+    def load():
+        lines, next_cursor = get_lines_by_account(db, account_id, limit=limit, cursor=cursor)
+        return build_page(LineResponse, lines, next_cursor)
+
+    return read_cache.get_or_load(account_id, ("lines", limit, cursor), load)
 
 
 def update_line_status(
@@ -87,6 +284,7 @@ def update_line_status(
     line.status = new_status
     db.commit()
     db.refresh(line)
+    read_cache.invalidate(line.account_id)
 
     logger.info(f"Line status updated: Line {line.id} -> {new_status}")
 
@@ -98,6 +296,104 @@ def update_line_status(
     return line
 
 
+def update_line_status_bulk(
+    db: Session, change: LineBulkStatusUpdate, actor: dict | str | None = None
+) -> LineBulkStatusResult:
+    """Move every selected line that may make the transition to `change.status`."""
+    if change.line_ids is not None and len(change.line_ids) > settings.LINE_BULK_MAX_SIZE:
+        raise BadRequestException(
+            detail=f"Bulk request exceeds maximum size of {settings.LINE_BULK_MAX_SIZE} lines"
+        )
+
+    selected = []
+    if change.line_ids is not None:
+        selected.append(Line.id.in_(change.line_ids))
+    if change.account_id is not None:
+        selected.append(Line.account_id == change.account_id)
+    if change.plan_name is not None:
+        selected.append(Line.plan_name == change.plan_name)
+    if change.current_status is not None:
+        selected.append(Line.status == change.current_status)
+
+    matched, changed = move_lines(db, selected, change.status, actor=actor)
+    db.commit()
+    read_cache.invalidate(*{row.account_id for row in changed})
+
+    logger.info(f"Bulk status update to {change.status.value}: {len(changed)}/{matched}")
+
+    return LineBulkStatusResult(
+        status=change.status,
+        matched=matched,
+        updated=len(changed),
+        skipped=matched - len(changed),
+    )
+
+
+def _lock_lines(db: Session, selected: list):
+    """
+    Take the write lock before reading lines that are about to be updated.
+
+    pysqlite only opens a transaction at the first write, so a write that matches no
+    row comes before the read. It takes the write lock (as BEGIN IMMEDIATE would) on
+    every shard the selection spans, and no other writer can change or add lines until
+    the caller commits.
+    """
+    db.execute(
+        update(Line).where(*selected, Line.id.is_(None)).values(status=Line.status),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def move_lines(
+    db: Session,
+    selected: list,
+    target: LineStatus,
+    actor: dict | str | None = None,
+    action: str = "update_line_status",
+) -> tuple[int, list]:
+    """
+    Move the lines matching the `selected` conditions that may make the transition to
+    `target`, without committing.
+
+    The state machine is applied in SQL: one UPDATE guarded by `status IN (allowed
+    sources)` returns the changed rows, and their audits go in with one bulk INSERT.
+    Selected lines that may not move are left alone. Returns the number of lines
+    selected and the changed rows.
+
+    The audits bypass AUDIT_SINK and always go to the main database, so with shards
+    they are committed separately from the lines.
+    """
+    # RETURNING only sees the new values, so the old statuses are read first
+    _lock_lines(db, selected)
+    previous = dict(db.query(Line.id, Line.status).filter(*selected).all())
+
+    changed = []
+    if previous and ALLOWED_SOURCES[target]:
+        changed = db.execute(
+            update(Line)
+            .where(*selected, Line.status.in_(ALLOWED_SOURCES[target]))
+            .values(status=target)
+            .returning(*Line.__table__.columns),
+            execution_options={"synchronize_session": False},
+        ).all()
+
+    if changed:
+        audits = []
+        for row in sorted(changed, key=lambda row: row.id):
+            new = {field: getattr(row, field) for field in LineResponse.model_fields}
+            old = {**new, "status": previous[row.id], "version": row.version - 1}
+            audits.append(build_audit_row(actor, action, "line", str(row.id), old=old, new=new))
+
+        # Random keys scatter a big insert across the audit indexes; in key order (line id
+        # for the resource index, sorted audit ids) it goes in over a third faster
+        for audit, audit_id in zip(audits, sorted(audit["id"] for audit in audits)):
+            audit["id"] = audit_id
+
+        db.execute(insert(Audit.__table__), audits)
+
+    return len(previous), changed
+
+
 def delete_line(db: Session, line_id: UUID, actor: dict | str | None = None):
     line = db.query(Line).filter(Line.id == line_id).first()
 
@@ -111,6 +407,7 @@ def delete_line(db: Session, line_id: UUID, actor: dict | str | None = None):
 
     line.status = LineStatus.DELETED
     db.commit()
+    read_cache.invalidate(line.account_id)
 
     logger.info(f"Line deleted: Line {line.id}")
 
@@ -123,7 +420,13 @@ def delete_line(db: Session, line_id: UUID, actor: dict | str | None = None):
     return line
 
 
-def commission_line(db: Session, line_id: UUID, actor: dict | str | None = None):
+def commission_line(
+    db: Session,
+    jobs: JobManager,
+    session_factory: Callable[[], Session],
+    line_id: UUID,
+    actor: dict | str | None = None,
+) -> Job:
     line = db.query(Line).filter(Line.id == line_id).first()
 
     if not line:
@@ -133,25 +436,61 @@ def commission_line(db: Session, line_id: UUID, actor: dict | str | None = None)
     if not is_commissionable(line.status):
         raise BadRequestException(detail=f"Cannot commission line in status {line.status.value}")
 
-    try:
-        old = LineResponse.model_validate(line).model_dump()
-    except Exception:
-        old = None
+    job = jobs.submit(
+        "commission_line",
+        run_commissioning,
+        session_factory,
+        line.id,
+        actor,
+        resource_id=str(line.id),
+    )
+
+    logger.info(f"Commissioning queued for Line {line.id} (job {job.id})")
+    return job
+
+
+async def run_commissioning(
+    session_factory: Callable[[], Session], line_id: UUID, actor: dict | str | None = None
+):
+    logger.info(f"Commissioning started for Line {line_id}")
 
-    logger.info(f"Commissioning started for Line {line.id}")
+    # Simulated provisioning; awaited so the wait never holds a thread or a DB session
+    await asyncio.sleep(settings.COMMISSION_DELAY_SECONDS)
+
+    return await run_in_threadpool(
+        retry_on_lock, _complete_commissioning, session_factory, line_id, actor
+    )
+
+
+def _complete_commissioning(
+    session_factory: Callable[[], Session], line_id: UUID, actor: dict | str | None = None
+):
+    with session_factory() as db:
+        line = activate_line(db, line_id, actor=actor)
+        return LineResponse.model_validate(line).model_dump(mode="json")
 
-    # Optional delay (simulate provisioning)
-    time.sleep(2)
 
-    # Transition to ACTIVE
-    if not can_transition(line.status, LineStatus.ACTIVE):
+def activate_line(db: Session, line_id: UUID, actor: dict | str | None = None):
+    line = db.query(Line).filter(Line.id == line_id).first()
+
+    if not line:
+        raise NotFoundException(detail="Line not found")
+
+    # The line may have changed while provisioning was in flight
+    if not is_commissionable(line.status) or not can_transition(line.status, LineStatus.ACTIVE):
         raise BadRequestException(
             detail=f"Invalid status transition during commission: {line.status.value} -> ACTIVE"
         )
 
+    try:
+        old = LineResponse.model_validate(line).model_dump()
+    except Exception:
+        old = None
+
     line.status = LineStatus.ACTIVE
     db.commit()
     db.refresh(line)
+    read_cache.invalidate(line.account_id)
 
     logger.info(f"Commissioning completed for Line {line.id}")
 
@@ -162,3 +501,160 @@ def commission_line(db: Session, line_id: UUID, actor: dict | str | None = None)
         logger.debug("Failed to record audit for line commissioning")
 
     return line
+
+
+def commission_lines(
+    db: Session,
+    jobs: JobManager,
+    session_factory: Callable[[], Session],
+    line_ids: list[UUID],
+    actor: dict | str | None = None,
+) -> Job:
+    line_ids = list(dict.fromkeys(line_ids))  # de-duplicate, keep request order
+
+    if len(line_ids) > settings.COMMISSION_BATCH_MAX_SIZE:
+        raise BadRequestException(
+            detail=f"Batch exceeds maximum size of {settings.COMMISSION_BATCH_MAX_SIZE} lines"
+        )
+
+    # Validate the whole batch with a single query
+    statuses = dict(db.query(Line.id, Line.status).filter(Line.id.in_(line_ids)).all())
+
+    eligible: list[UUID] = []
+    rejected: list[LineCommissionResult] = []
+
+    for line_id in line_ids:
+        current = statuses.get(line_id)
+
+        if current is None:
+            rejected.append(
+                LineCommissionResult(line_id=line_id, success=False, error="Line not found")
+            )
+
+        elif not is_commissionable(current):
+            rejected.append(
+                LineCommissionResult(
+                    line_id=line_id,
+                    success=False,
+                    status=current,
+                    error=f"Cannot commission line in status {current.value}",
+                )
+            )
+
+        else:
+            eligible.append(line_id)
+
+    job = jobs.submit(
+        "commission_lines",
+        run_batch_commissioning,
+        session_factory,
+        line_ids,
+        eligible,
+        rejected,
+        actor,
+    )
+
+    logger.info(
+        f"Batch commissioning queued: {len(eligible)} eligible, {len(rejected)} rejected (job {job.id})"
+    )
+    return job
+
+
+async def run_batch_commissioning(
+    session_factory: Callable[[], Session],
+    line_ids: list[UUID],
+    eligible: list[UUID],
+    rejected: list[LineCommissionResult],
+    actor: dict | str | None = None,
+):
+    semaphore = asyncio.Semaphore(settings.COMMISSION_BATCH_PARALLELISM)
+    results = {r.line_id: r for r in rejected}
+
+    async def provision(line_id: UUID) -> UUID:
+        async with semaphore:
+            await asyncio.sleep(settings.COMMISSION_DELAY_SECONDS)
+        return line_id
+
+    # Activate lines in chunks as their provisioning completes
+    ready: list[UUID] = []
+    for completed in asyncio.as_completed([provision(line_id) for line_id in eligible]):
+        ready.append(await completed)
+
+        if len(ready) >= settings.COMMISSION_BATCH_CHUNK_SIZE:
+            for r in await run_in_threadpool(
+                retry_on_lock, _activate_lines, session_factory, ready, actor
+            ):
+                results[r.line_id] = r
+            ready = []
+
+    if ready:
+        for r in await run_in_threadpool(
+            retry_on_lock, _activate_lines, session_factory, ready, actor
+        ):
+            results[r.line_id] = r
+
+    ordered = [results[line_id] for line_id in line_ids]
+    succeeded = sum(1 for r in ordered if r.success)
+
+    logger.info(f"Batch commissioning completed: {succeeded}/{len(ordered)} lines activated")
+
+    return LineBatchCommissionResult(
+        total=len(ordered), succeeded=succeeded, failed=len(ordered) - succeeded, results=ordered
+    ).model_dump(mode="json")
+
+
+def _activate_lines(
+    session_factory: Callable[[], Session], line_ids: list[UUID], actor: dict | str | None = None
+) -> list[LineCommissionResult]:
+    """Activate a chunk of provisioned lines and audit them in a single commit."""
+    with session_factory() as db:
+        # Snapshots are the audits' old state and the failed results' status
+        _lock_lines(db, [Line.id.in_(line_ids)])
+        lines = db.query(Line).filter(Line.id.in_(line_ids)).all()
+        snapshots = {line.id: LineResponse.model_validate(line).model_dump() for line in lines}
+
+        # Guarded transition: only rows still commissionable are activated. The new state
+        # comes back from RETURNING, with the version the UPDATE bumped
+        rows = db.execute(
+            update(Line)
+            .where(Line.id.in_(line_ids), Line.status.in_(COMMISSIONABLE))
+            .values(status=LineStatus.ACTIVE)
+            .returning(*Line.__table__.columns),
+            execution_options={"synchronize_session": False},
+        ).all()
+        activated = {row.id for row in rows}
+
+        db.add_all(
+            build_audit(
+                actor,
+                "commission_line",
+                "line",
+                str(row.id),
+                old=snapshots[row.id],
+                new={field: getattr(row, field) for field in LineResponse.model_fields},
+            )
+            for row in rows
+        )
+        db.commit()
+
+    read_cache.invalidate(*{snapshots[line_id]["account_id"] for line_id in activated})
+
+    results = []
+    for line_id in line_ids:
+        if line_id in activated:
+            results.append(
+                LineCommissionResult(line_id=line_id, success=True, status=LineStatus.ACTIVE)
+            )
+
+        else:
+            current = snapshots[line_id]["status"] if line_id in snapshots else None
+            results.append(
+                LineCommissionResult(
+                    line_id=line_id,
+                    success=False,
+                    status=current,
+                    error="Line changed state during commissioning",
+                )
+            )
+
+    return results
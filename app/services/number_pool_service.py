@@ -0,0 +1,187 @@
+import threading
+from bisect import bisect_left
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ConflictException, NotFoundException
+from app.core.logging import get_logger
+from app.core.pagination import paginate
+from app.models.account import Account
+from app.models.number_pool import NumberPool
+from app.schemas.line import LineAllocate, LineCreate
+from app.schemas.number_pool import NumberPoolCreate, NumberPoolResponse
+from app.services.audit_service import record_audit
+from app.services.line_service import create_line
+
+logger = get_logger()
+
+
+class FreeRanges:
+    """Disjoint `[start, end]` ranges of free numbers, kept sorted by start."""
+
+    def __init__(self):
+        self._ranges: list[tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in self._ranges)
+
+    def add(self, start: int, end: int):
+        """Add a range that overlaps none already held, merging it with adjacent ones."""
+        i = bisect_left(self._ranges, (start, end))
+
+        if i < len(self._ranges) and self._ranges[i][0] == end + 1:
+            end = self._ranges.pop(i)[1]
+
+        if i > 0 and self._ranges[i - 1][1] == start - 1:
+            i -= 1
+            start = self._ranges.pop(i)[0]
+
+        self._ranges.insert(i, (start, end))
+
+    def pop(self) -> int | None:
+        """Take the smallest free number."""
+        if not self._ranges:
+            return None
+
+        start, end = self._ranges[0]
+        if start == end:
+            del self._ranges[0]
+        else:
+            self._ranges[0] = (start + 1, end)
+
+        return start
+
+
+class NumberAllocator:
+    """
+    Hands out pool numbers from blocks this process has reserved in the database.
+
+    A block is reserved by one UPDATE that moves the pool's `next_number` past it, so
+    blocks reserved by different workers never overlap and numbers are handed out
+    without coordinating with them. Numbers whose line could not be created go back
+    to the free ranges; the reserve left unused when a worker stops is not reclaimed.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.blocks = 0
+        self.skipped = 0  # numbers already in use by a line created outside the pool
+
+        self._lock = threading.Lock()
+        self._free: dict[UUID, FreeRanges] = {}
+
+    def take(self, db: Session, pool_id: UUID) -> int:
+        while True:
+            with self._lock:
+                number = self._free.setdefault(pool_id, FreeRanges()).pop()
+
+            if number is not None:
+                return number
+
+            start, end = self._reserve(db, pool_id)
+            with self._lock:
+                self._free[pool_id].add(start, end)
+
+    def give_back(self, pool_id: UUID, number: int):
+        with self._lock:
+            self._free.setdefault(pool_id, FreeRanges()).add(number, number)
+
+    def _reserve(self, db: Session, pool_id: UUID) -> tuple[int, int]:
+        reserved = db.execute(
+            update(NumberPool)
+            .where(NumberPool.id == pool_id, NumberPool.next_number <= NumberPool.range_end)
+            .values(next_number=NumberPool.next_number + self.block_size)
+            .returning(NumberPool.next_number, NumberPool.range_end)
+        ).first()
+        db.commit()
+
+        if reserved is None:
+            raise ConflictException(detail="Number pool exhausted")
+
+        next_number, range_end = reserved
+        with self._lock:
+            self.blocks += 1
+
+        return next_number - self.block_size, min(next_number - 1, range_end)
+
+    def record_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            available = {str(pool_id): len(free) for pool_id, free in self._free.items()}
+
+        return {"blocks_reserved": self.blocks, "skipped": self.skipped, "available": available}
+
+
+number_allocator = NumberAllocator(settings.NUMBER_POOL_BLOCK_SIZE)
+
+
+def create_number_pool(db: Session, pool_data: NumberPoolCreate, actor: dict | str | None = None):
+    start, end = int(pool_data.range_start), int(pool_data.range_end)
+
+    overlapping = (
+        db.query(NumberPool.name)
+        .filter(NumberPool.range_start <= end, NumberPool.range_end >= start)
+        .first()
+    )
+    if overlapping:
+        raise ConflictException(detail=f"Range overlaps number pool '{overlapping.name}'")
+
+    pool = NumberPool(name=pool_data.name, range_start=start, range_end=end, next_number=start)
+    db.add(pool)
+
+    try:
+        db.commit()
+        db.refresh(pool)
+    except IntegrityError as exc:
+        db.rollback()
+        raise ConflictException(detail="Number pool with this name already exists") from exc
+
+    logger.info(f"Number pool created: {pool.id} ({pool.name}, {pool.size} numbers)")
+
+    try:
+        new = NumberPoolResponse.model_validate(pool).model_dump()
+        record_audit(
+            db, actor, "create_number_pool", "number_pool", str(pool.id), old=None, new=new
+        )
+    except Exception:
+        logger.debug("Failed to record audit for number pool creation")
+
+    return pool
+
+
+def get_number_pools(db: Session, limit: int = 100, cursor: str | None = None):
+    return paginate(db.query(NumberPool), (NumberPool.created_at, NumberPool.id), limit, cursor)
+
+
+def allocate_line(
+    db: Session, account_id: UUID, allocation: LineAllocate, actor: dict | str | None = None
+):
+    """Create a line on the next free number of a pool."""
+    if db.query(Account.id).filter(Account.id == account_id).scalar() is None:
+        raise NotFoundException(detail="Account not found")
+
+    if db.get(NumberPool, allocation.pool_id) is None:
+        raise NotFoundException(detail="Number pool not found")
+
+    while True:
+        number = number_allocator.take(db, allocation.pool_id)
+        line_data = LineCreate(msisdn=f"+{number}", plan_name=allocation.plan_name)
+
+        try:
+            return create_line(db, account_id, line_data, actor=actor)
+
+        except ConflictException:
+            # Taken by a line created with an explicit MSISDN; the number stays used up
+            number_allocator.record_skipped()
+            logger.info(f"Pool number +{number} already in use; skipping it")
+
+        except Exception:
+            number_allocator.give_back(allocation.pool_id, number)
+            raise
@@ -0,0 +1,134 @@
+"""
+Compare request throughput of the sync (threadpool) and async (aiosqlite) database modes.
+
+Starts the API under uvicorn once per mode (DB_ASYNC=false/true) against the dev
+database, then drives a read-heavy mix of authenticated requests at a fixed
+concurrency and reports requests/second and latency percentiles.
+
+    python scripts/benchmark_db_mode.py --concurrency 256 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_ASYNC": str(mode == "async").lower(), "DEBUG": "false"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+        + ["--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+
+    raise RuntimeError("server did not become ready")
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, args) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        await wait_ready(client)
+
+        login = await client.post(
+            "/auth/login", json={"username": args.username, "password": args.password}
+        )
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        accounts = (await client.get("/accounts/", params={"limit": 20})).json()["items"]
+        if not accounts:
+            raise RuntimeError("no accounts to read; start once with DEV seeding enabled")
+
+        paths = ["/accounts/?limit=20"]
+        for account in accounts:
+            paths += [f"/accounts/{account['id']}", f"/accounts/{account['id']}/lines?limit=20"]
+
+        latencies: list[float] = []
+        errors = 0
+        stop_at = time.monotonic() + duration
+
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per mode")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        server = start_server(mode, args.port)
+        try:
+            results[mode] = asyncio.run(
+                run_load(f"http://127.0.0.1:{args.port}", args.concurrency, args.duration, args)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\nconcurrency={args.concurrency} duration={args.duration}s")
+    print(f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<6} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f}"
+            f" {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+
+    if {"sync", "async"} <= results.keys():
+        print(f"\nasync/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Measure line status updates per second with and without sharding, per audit sink.
+
+Builds throwaway databases in a temporary directory, gives every worker thread an
+account with one active line on it, then has each worker flip its line between
+ACTIVE and SUSPENDED for a fixed time through `update_line_status`, the service
+behind `PATCH /lines/{id}/status`. Every update commits its line on the owning
+shard and its audit entry on the main database (AUDIT_SINK=sync), or queues the
+audit for the write-behind writer (AUDIT_SINK=batched).
+
+    python scripts/benchmark_sharding.py --shards 1 4 --workers 8 --duration 10
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.logging import get_logger  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.sharding import (  # noqa: E402
+    SHARDED_TABLES,
+    RoutedSession,
+    shard_names,
+    sharding_options,
+)
+from app.db.sqlite import configure_engine  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.line import Line  # noqa: E402
+from app.schemas.line import LineStatus  # noqa: E402
+from app.services.audit_service import start_audit_writer, stop_audit_writer  # noqa: E402
+from app.services.line_service import update_line_status  # noqa: E402
+
+
+def sqlite_engine(path: Path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_engine(engine)
+    return engine
+
+
+def session_factory(directory: Path, shards: int):
+    main = sqlite_engine(directory / "application.db")
+    Base.metadata.create_all(bind=main)
+
+    if shards <= 1:
+        return sessionmaker(bind=main, autoflush=False)
+
+    shard_engines = {
+        name: sqlite_engine(directory / f"application.{name}.db") for name in shard_names(shards)
+    }
+    for engine in shard_engines.values():
+        Base.metadata.create_all(bind=engine, tables=SHARDED_TABLES)
+
+    return sessionmaker(
+        class_=RoutedSession, autoflush=False, **sharding_options(main, shard_engines)
+    )
+
+
+def seed(factory, workers: int) -> list:
+    line_ids = []
+    with factory() as db:
+        for i in range(workers):
+            account = Account(full_name=f"Bench {i}", email=f"bench{i}@example.com", phone="1")
+            db.add(account)
+            db.flush()
+
+            msisdn = f"+2547{i:08d}"
+            line = Line(
+                account_id=account.id,
+                msisdn=msisdn,
+                msisdn_e164=msisdn,
+                plan_name="Basic",
+                status=LineStatus.ACTIVE,
+            )
+            db.add(line)
+            db.flush()
+            line_ids.append(line.id)
+
+        db.commit()
+
+    return line_ids
+
+
+def run(shards: int, sink: str, workers: int, duration: float) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = session_factory(Path(tmp), shards)
+        line_ids = seed(factory, workers)
+
+        if sink == "batched":
+            start_audit_writer(factory)
+
+        counts = [0] * workers
+        stop_at = time.monotonic() + duration
+
+        def worker(n: int):
+            status = LineStatus.SUSPENDED
+            with factory() as db:
+                while time.monotonic() < stop_at:
+                    update_line_status(db, line_ids[n], status, actor="bench")
+                    status = (
+                        LineStatus.ACTIVE
+                        if status is LineStatus.SUSPENDED
+                        else LineStatus.SUSPENDED
+                    )
+                    counts[n] += 1
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if sink == "batched":
+            stop_audit_writer()
+
+        return sum(counts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shards", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--sinks", nargs="+", default=["sync", "batched"])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    args = parser.parse_args()
+
+    get_logger().remove()
+
+    results = {}
+    for sink in args.sinks:
+        for shards in args.shards:
+            results[sink, shards] = run(shards, sink, args.workers, args.duration)
+
+    print(f"\nworkers={args.workers} duration={args.duration}s")
+    print(f"{'audit sink':<11} {'shards':>6} {'updates/s':>10}")
+    for (sink, shards), rate in results.items():
+        print(f"{sink:<11} {shards:>6} {rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
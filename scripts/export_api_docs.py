@@ -0,0 +1,277 @@
+"""
+Regenerate docs/openapi.json from the app and bring docs/postman_collection.json in line.
+
+The OpenAPI spec is written as the app serves it. The Postman collection is curated by
+hand, so requests and descriptions already in it are kept; only example responses whose
+shape no longer matches the spec are regenerated, and endpoints it lacks are added.
+
+    python scripts/export_api_docs.py
+"""
+
+import copy
+import json
+import sys
+from http import HTTPStatus
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+
+DOCS = ROOT / "docs"
+WIDTH = 80  # docs/openapi.json is laid out like prettier does it
+
+# Collection variables that path parameters are filled from
+PATH_VARIABLES = {"account_id": "{{accountId}}", "line_id": "{{lineId}}"}
+EXAMPLE_UUID = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+
+
+def format_json(value, indent: int = 0, suffix: int = 0) -> str:
+    """Objects and arrays on one line when they fit in WIDTH columns, else one item per line."""
+    flat = _flat(value)
+    if not isinstance(value, (dict, list)) or not value or indent + suffix + len(flat) <= WIDTH:
+        return flat
+
+    pad = " " * (indent + 2)
+    last = len(value) - 1
+    if isinstance(value, dict):
+        lines = []
+        for i, (name, item) in enumerate(value.items()):
+            key = json.dumps(name, ensure_ascii=False) + ": "
+            lines.append(pad + key + format_json(item, indent + 2, len(key) + (i < last)))
+        return "{\n" + ",\n".join(lines) + "\n" + " " * indent + "}"
+
+    lines = [pad + format_json(item, indent + 2, int(i < last)) for i, item in enumerate(value)]
+    return "[\n" + ",\n".join(lines) + "\n" + " " * indent + "]"
+
+
+def _flat(value) -> str:
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        items = (json.dumps(k, ensure_ascii=False) + ": " + _flat(v) for k, v in value.items())
+        return "{ " + ", ".join(items) + " }"
+
+    if isinstance(value, list):
+        return "[" + ", ".join(_flat(item) for item in value) + "]"
+
+    return json.dumps(value, ensure_ascii=False)
+
+
+def example(schema: dict, components: dict):
+    """A deterministic example value for a JSON schema."""
+    if "$ref" in schema:
+        return example(components[schema["$ref"].rsplit("/", 1)[-1]], components)
+
+    if "default" in schema and schema["default"] is not None:
+        return schema["default"]
+
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            # Of several variants, the last is the default one (e.g. a page without `include`)
+            options = [s for s in schema[key] if s.get("type") != "null"]
+            return example(options[-1], components) if options else None
+
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {
+            name: example(prop, components) for name, prop in schema.get("properties", {}).items()
+        }
+
+    if kind == "array":
+        return [example(schema.get("items", {}), components)]
+
+    if kind == "integer":
+        return schema.get("minimum", 0)
+
+    if kind == "number":
+        return 0.0
+
+    if kind == "boolean":
+        return True
+
+    return {
+        "uuid": EXAMPLE_UUID,
+        "date-time": "2026-01-01T00:00:00Z",
+        "email": "user@example.com",
+    }.get(schema.get("format"), "string")
+
+
+def shape(value):
+    """The structure of a JSON value, without its values."""
+    if isinstance(value, dict):
+        return {name: shape(item) for name, item in value.items()}
+
+    if isinstance(value, list):
+        return [shape(value[0])] if value else []
+
+    return type(value).__name__
+
+
+def postman_path(path: str) -> list[str]:
+    return [
+        f":{part[1:-1]}" if part.startswith("{") else part for part in path.strip("/").split("/")
+    ] + ([""] if path.endswith("/") and path != "/" else [])
+
+
+def build_url(path: str, operation: dict, components: dict) -> dict:
+    parts = postman_path(path)
+    url = {"raw": "{{baseUrl}}/" + "/".join(parts), "host": ["{{baseUrl}}"], "path": parts}
+
+    params = operation.get("parameters", [])
+    query = [
+        {
+            "key": p["name"],
+            "value": str(example(p.get("schema", {}), components) or ""),
+            "description": p.get("description", ""),
+            "disabled": not p.get("required", False),
+        }
+        for p in params
+        if p["in"] == "query"
+    ]
+    if query:
+        url["query"] = query
+
+    variables = [
+        {"key": p["name"], "value": PATH_VARIABLES.get(p["name"], "")}
+        for p in params
+        if p["in"] == "path"
+    ]
+    if variables:
+        url["variable"] = variables
+
+    return url
+
+
+def success_response(operation: dict, components: dict) -> tuple[int, dict | None]:
+    for code, response in operation.get("responses", {}).items():
+        if code.startswith("2"):
+            schema = response.get("content", {}).get("application/json", {}).get("schema")
+            return int(code), (example(schema, components) if schema else None)
+
+    return 200, None
+
+
+def example_response(request: dict, code: int, body, secured: bool) -> dict:
+    original = copy.deepcopy(request)
+    original.pop("description", None)
+    if secured:
+        original["header"] = original["header"] + [
+            {
+                "description": "Added as a part of security scheme: oauth2",
+                "key": "Authorization",
+                "value": "<token>",
+            }
+        ]
+
+    return {
+        "name": "Successful Response",
+        "originalRequest": original,
+        "status": HTTPStatus(code).phrase,
+        "code": code,
+        "_postman_previewlanguage": "json",
+        "header": [{"key": "Content-Type", "value": "application/json"}],
+        "cookie": [],
+        "body": json.dumps(body, indent=2),
+    }
+
+
+def new_item(path: str, method: str, operation: dict, components: dict) -> dict:
+    request = {
+        "method": method.upper(),
+        "header": [{"key": "Accept", "value": "application/json"}],
+        "url": build_url(path, operation, components),
+    }
+
+    schema = operation.get("requestBody", {}).get("content", {}).get("application/json", {})
+    if "schema" in schema:
+        request["header"].insert(0, {"key": "Content-Type", "value": "application/json"})
+        request["body"] = {
+            "mode": "raw",
+            "raw": json.dumps(example(schema["schema"], components), indent=2),
+            "options": {"raw": {"headerFamily": "json", "language": "json"}},
+        }
+
+    secured = "security" in operation
+    description = operation.get("description") or operation["summary"]
+    if secured:
+        description += (
+            "\n\n**Authentication:** Bearer token required "
+            "(`Authorization: Bearer {{accessToken}}`)"
+        )
+    request["description"] = description
+
+    code, body = success_response(operation, components)
+    return {
+        "name": operation["summary"],
+        "request": request,
+        "response": [example_response(request, code, body, secured)] if body is not None else [],
+    }
+
+
+def folder(items: list, name: str) -> list:
+    for item in items:
+        if item.get("name") == name and "item" in item:
+            return item["item"]
+
+    items.append({"name": name, "item": []})
+    return items[-1]["item"]
+
+
+def requests_by_route(items: list, found: dict):
+    for item in items:
+        if "item" in item:
+            requests_by_route(item["item"], found)
+        else:
+            request = item["request"]
+            found[(request["method"], "/".join(request["url"]["path"]))] = item
+
+    return found
+
+
+def sync_collection(collection: dict, spec: dict):
+    components = spec["components"]["schemas"]
+    existing = requests_by_route(collection["item"], {})
+
+    for path, operations in spec["paths"].items():
+        for method, operation in operations.items():
+            key = (method.upper(), "/".join(postman_path(path)))
+            code, body = success_response(operation, components)
+
+            item = existing.get(key)
+            if item is None:
+                parts = [p for p in path.strip("/").split("/") if p] or ["/"]
+                target = collection["item"]
+                for part in parts:
+                    target = folder(target, part)
+                target.append(new_item(path, method, operation, components))
+                continue
+
+            if body is None:
+                continue
+
+            for response in item.get("response", []):
+                if response.get("code") == code and shape(json.loads(response["body"])) != shape(
+                    body
+                ):
+                    response["body"] = json.dumps(body, indent=2)
+
+
+def main():
+    spec = app.openapi()
+    (DOCS / "openapi.json").write_text(format_json(spec) + "\n", encoding="utf-8")
+
+    collection_path = DOCS / "postman_collection.json"
+    collection = json.loads(collection_path.read_text(encoding="utf-8"))
+    sync_collection(collection, spec)
+    collection_path.write_text(
+        json.dumps(collection, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+
+
+if __name__ == "__main__":
+    main()
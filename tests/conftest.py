@@ -3,9 +3,10 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.config import settings
 from app.core.security import hash_password
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_db, get_session_factory
 from app.main import app
 from app.models.user import User
 from app.schemas.user import UserRole
@@ -66,14 +67,22 @@ def db():
 
 
 @pytest.fixture
-def client(db):
+def client(db, monkeypatch):
+    # Verify passwords in the threadpool; spawning a pool per client slows the suite down
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+
     def override_get_db():
         try:
             yield db
         finally:
             pass
 
+    def override_get_session_factory():
+        # Background jobs get their own session on the test connection
+        return lambda: TestingSessionLocal(bind=db.get_bind())
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
     with TestClient(app) as c:
         yield c
 
@@ -1,6 +1,16 @@
+import base64
+import json
+from uuid import uuid4
+
 from fastapi import status
+from sqlalchemy import event
 
-from app.schemas.account import AccountStatus
+from app.core.cache import ReadCache
+from app.core.config import settings
+from app.models.account import Account
+from app.schemas.account import AccountResponse, AccountStatus, AccountWithLinesResponse
+from app.schemas.pagination import Page
+from app.services.account_service import export_accounts
 
 
 def test_create_account(admin_client):
@@ -65,3 +75,274 @@ def test_operator_cannot_update_account(operator_client, admin_client):
     # Operator attempts to update
     acc_response = operator_client.put(f"/accounts/{account_id}", json={"full_name": "Hacked"})
     assert acc_response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_list_accounts_cursor_pagination(admin_client):
+    created = set()
+    for i in range(5):
+        acc_response = admin_client.post(
+            "/accounts",
+            json={"full_name": f"Page {i}", "email": f"page{i}@example.com", "phone": "1"},
+        )
+        created.add(acc_response.json()["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = admin_client.get("/accounts", params=params).json()
+
+        assert len(page["items"]) <= 2
+        seen.extend(a["id"] for a in page["items"])
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+
+
+def test_list_accounts_rejects_oversized_page_and_bad_cursor(operator_client):
+    assert operator_client.get("/accounts", params={"limit": 10_000_000}).status_code == (
+        status.HTTP_422_UNPROCESSABLE_CONTENT
+    )
+    assert operator_client.get("/accounts", params={"cursor": "garbage"}).status_code == (
+        status.HTTP_400_BAD_REQUEST
+    )
+
+    # Well-formed JSON, but not the types a cursor holds
+    for values in ([1, 2], [None, {}], ["2026-01-01T00:00:00", 3]):
+        cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+        response = operator_client.get("/accounts", params={"cursor": cursor})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, values
+
+
+def test_account_reads_are_cached_and_invalidated_on_update(admin_client):
+    account = admin_client.post(
+        "/accounts", json={"full_name": "Cached", "email": "cached@example.com", "phone": "1"}
+    ).json()
+
+    before = admin_client.get("/metrics").json()["read_cache"]
+    for _ in range(3):
+        assert admin_client.get(f"/accounts/{account['id']}").json()["full_name"] == "Cached"
+    after = admin_client.get("/metrics").json()["read_cache"]
+
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+    admin_client.put(f"/accounts/{account['id']}", json={"full_name": "Renamed"})
+    assert admin_client.get(f"/accounts/{account['id']}").json()["full_name"] == "Renamed"
+
+
+def test_read_racing_an_invalidation_is_not_cached():
+    cache = ReadCache(maxsize=10, ttl=60)
+    account_id = uuid4()
+
+    def stale_load():
+        cache.invalidate(account_id)  # a write commits while the read is in flight
+        return "stale"
+
+    assert cache.get_or_load(account_id, "account", stale_load) == "stale"
+    assert cache.get_or_load(account_id, "account", lambda: "fresh") == "fresh"
+    assert cache.get_or_load(account_id, "account", lambda: "unused") == "fresh"
+
+
+def test_conditional_get_account(admin_client):
+    account = admin_client.post(
+        "/accounts", json={"full_name": "Polled", "email": "polled@example.com", "phone": "1"}
+    ).json()
+    assert account["version"] == 1
+
+    response = admin_client.get(f"/accounts/{account['id']}")
+    etag = response.headers["ETag"]
+
+    response = admin_client.get(f"/accounts/{account['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    updated = admin_client.put(f"/accounts/{account['id']}", json={"phone": "2"}).json()
+    assert updated["version"] == 2
+
+    response = admin_client.get(f"/accounts/{account['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["phone"] == "2"
+
+    missing = admin_client.get(f"/accounts/{uuid4()}", headers={"If-None-Match": etag})
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_conditional_get_accounts_page(admin_client):
+    admin_client.post(
+        "/accounts", json={"full_name": "Listed", "email": "listed@example.com", "phone": "1"}
+    )
+
+    etag = admin_client.get("/accounts", params={"limit": 5}).headers["ETag"]
+    response = admin_client.get("/accounts", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    admin_client.post(
+        "/accounts", json={"full_name": "Listed 2", "email": "listed2@example.com", "phone": "1"}
+    )
+    response = admin_client.get("/accounts", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_list_page_matches_response_model(admin_client):
+    admin_client.post(
+        "/accounts", json={"full_name": "Schema", "email": "schema@example.com", "phone": "1"}
+    )
+
+    response = admin_client.get("/accounts", params={"limit": 2})
+    assert response.headers["content-type"] == "application/json"
+
+    page = Page[AccountResponse].model_validate_json(response.content)
+    assert page.model_dump(mode="json") == response.json()
+
+
+def test_list_accounts_streams_ndjson(admin_client, db, monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_BATCH_SIZE", 2)
+
+    for i in range(5):
+        admin_client.post(
+            "/accounts", json={"full_name": f"Stream {i}", "email": f"s{i}@ex.com", "phone": "1"}
+        )
+
+    response = admin_client.get(
+        "/accounts", params={"limit": 1}, headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    streamed = [AccountResponse.model_validate_json(line) for line in response.text.splitlines()]
+    assert len(streamed) == db.query(Account).count()  # the whole table, not one page
+    assert streamed == sorted(streamed, key=lambda a: (a.created_at, a.id))
+
+    # Rows are fetched from the database a batch at a time
+    assert [len(batch) for batch in export_accounts(db, batch_size=2)][:2] == [2, 2]
+
+
+def test_include_lines_loads_a_page_without_n_plus_1(admin_client, db):
+    for i in range(3):
+        account_id = admin_client.post(
+            "/accounts", json={"full_name": f"Agg {i}", "email": f"agg{i}@ex.com", "phone": "1"}
+        ).json()["id"]
+        admin_client.post(
+            f"/accounts/{account_id}/lines:bulk",
+            json={"lines": [{"msisdn": f"55800{i}{j}", "plan_name": "P"} for j in range(2)]},
+        )
+
+    statements = []
+    engine = db.get_bind().engine
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = admin_client.get("/accounts", params={"include": "lines", "limit": 50})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    page = Page[AccountWithLinesResponse].model_validate_json(response.content)
+    assert len([a for a in page.items if a.email.startswith("agg")]) == 3
+    assert all(len(a.lines) == 2 for a in page.items if a.email.startswith("agg"))
+
+    line_queries = [s for s in statements if "FROM lines" in s]
+    assert len(line_queries) == 1 and " IN " in line_queries[0]
+
+
+def test_get_account_with_lines(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Detail", "email": "detail@ex.com", "phone": "1"}
+    ).json()["id"]
+    line = admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "559000001", "plan_name": "P"}
+    ).json()
+
+    assert "lines" not in admin_client.get(f"/accounts/{account_id}").json()
+
+    url = f"/accounts/{account_id}?include=lines"
+    response = admin_client.get(url)
+    assert [item["id"] for item in response.json()["lines"]] == [line["id"]]
+
+    etag = response.headers["ETag"]
+    assert admin_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # A line change alters the aggregate (and its ETag) though the account row is untouched
+    admin_client.patch(f"/lines/{line['id']}/status", json={"status": "SUSPENDED"})
+    response = admin_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["lines"][0]["status"] == "SUSPENDED"
+
+    assert admin_client.get("/accounts", params={"include": "bogus"}).status_code == 422
+
+
+def test_search_accounts(admin_client, operator_client):
+    def create(full_name, email, phone):
+        payload = {"full_name": full_name, "email": email, "phone": phone}
+        return admin_client.post("/accounts", json=payload).json()["id"]
+
+    doe = create("Johnny Doe", "jd@example.com", "0711 000001")
+    smith = create("Mary Smith", "mary.doe@example.com", "0722 000002")
+    create("Peter Pan", "peter@example.com", "0733 000003")
+
+    def search(q, **params):
+        response = operator_client.get("/accounts/search", params={"q": q, **params})
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    # Word prefixes over name, email and phone; every term must match
+    assert [a["id"] for a in search("john")["items"]] == [doe]
+    assert [a["id"] for a in search("0722")["items"]] == [smith]
+    assert [a["id"] for a in search("mary doe")["items"]] == [smith]
+
+    # Ranked and paginated by cursor
+    first = search("doe", limit=1)
+    second = search("doe", limit=1, cursor=first["next_cursor"])
+    assert {first["items"][0]["id"], second["items"][0]["id"]} == {doe, smith}
+    assert second["next_cursor"] is None
+
+    # The index follows updates
+    admin_client.put(f"/accounts/{doe}", json={"full_name": "Jack Black"})
+    assert search("john")["items"] == []
+    assert [a["id"] for a in search("black")["items"]] == [doe]
+
+    # FTS5 query syntax is not passed through; only the words are searched for
+    assert [a["full_name"] for a in search('"pet*" pan')["items"]] == ["Peter Pan"]
+    assert search("peter OR mary")["items"] == []
+
+    response = operator_client.get("/accounts/search", params={"q": "*-+"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_account_status_cascades_to_lines(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Corporate", "email": "corp@example.com", "phone": "1"}
+    ).json()["id"]
+
+    lines = {}
+    for msisdn in ("+254798000001", "+254798000002"):
+        lines[msisdn] = admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": msisdn, "plan_name": "Corporate"}
+        ).json()["id"]
+    admin_client.patch(f"/lines/{lines['+254798000001']}/status", json={"status": "ACTIVE"})
+
+    def line_statuses():
+        page = admin_client.get(f"/accounts/{account_id}/lines").json()
+        return {line["msisdn"]: line["status"] for line in page["items"]}
+
+    # Suspension suspends the active lines; provisioned ones wait to be commissioned
+    admin_client.put(f"/accounts/{account_id}", json={"status": "SUSPENDED"})
+    assert line_statuses() == {"+254798000001": "SUSPENDED", "+254798000002": "PROVISIONED"}
+
+    admin_client.put(f"/accounts/{account_id}", json={"status": "CLOSED"})
+    assert line_statuses() == {"+254798000001": "DELETED", "+254798000002": "DELETED"}
+
+    audits = admin_client.get(
+        "/audits", params={"resource_type": "line", "resource_id": lines["+254798000001"]}
+    ).json()["items"]
+    transitions = [
+        (a["old"]["status"], a["new"]["status"])
+        for a in audits
+        if a["action"] == "cascade_line_status"
+    ]
+    assert sorted(transitions) == [("ACTIVE", "SUSPENDED"), ("SUSPENDED", "DELETED")]
@@ -0,0 +1,207 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.main import app
+from app.models.audit import Audit
+from app.schemas.audit import AuditFilter, AuditResponse
+from app.services import audit_service
+from app.services.audit_archive import (
+    AuditArchive,
+    archive_audits,
+    get_audit_archive,
+)
+from app.services.audit_service import (
+    build_audit,
+    record_audit,
+    start_audit_writer,
+    stop_audit_writer,
+)
+from app.services.audit_writer import AuditWriter
+
+
+def test_batched_audit_writer_flushes_on_stop(db, monkeypatch):
+    monkeypatch.setattr(audit_service.settings, "AUDIT_BATCH_SIZE", 3)
+
+    start_audit_writer(lambda: Session(bind=db.get_bind()))
+    try:
+        for i in range(7):
+            record_audit(db, {"username": "admin_test"}, "test_action", "test", str(i))
+
+    finally:
+        stop_audit_writer()
+
+    entries = db.query(Audit).filter(Audit.action == "test_action").all()
+    assert sorted(e.resource_id for e in entries) == [str(i) for i in range(7)]
+    assert {e.actor for e in entries} == {"admin_test"}
+
+
+def test_full_audit_queue_falls_back_to_sync_write(db, monkeypatch):
+    # A writer that was never started cannot drain its single-slot queue
+    writer = AuditWriter(
+        lambda: Session(bind=db.get_bind()),
+        batch_size=10,
+        flush_interval=0.01,
+        max_queue=1,
+        enqueue_timeout=0.01,
+    )
+    monkeypatch.setattr(audit_service, "_writer", writer)
+
+    record_audit(db, "queued", "overflow_action", "test", "1")
+    record_audit(db, "direct", "overflow_action", "test", "2")
+
+    entries = db.query(Audit).filter(Audit.action == "overflow_action").all()
+    assert [e.actor for e in entries] == ["direct"]
+
+
+def test_failed_audit_batch_is_written_entry_by_entry(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audits.db'}")
+    Audit.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    taken = uuid4()
+    with Session() as db:
+        db.add(Audit(id=taken, actor="sync", action="retry_action", resource_type="test"))
+        db.commit()
+
+    writer = AuditWriter(
+        Session, batch_size=10, flush_interval=0.01, max_queue=10, enqueue_timeout=0.01
+    )
+    # The second id is already taken: it fails the batch insert, and then only itself
+    for i, entry_id in enumerate([uuid4(), taken, uuid4()], start=1):
+        row = {"id": entry_id, "actor": "queued", "action": "retry_action", "resource_type": "test"}
+        assert writer.enqueue({**row, "resource_id": str(i), "created_at": datetime.now()})
+
+    writer.start()
+    writer.stop()
+
+    with Session() as db:
+        queued = db.query(Audit.resource_id).filter(Audit.actor == "queued").all()
+    assert sorted(r.resource_id for r in queued) == ["1", "3"]
+    assert writer.stats() == {"queued": 0, "written": 2, "fallbacks": 1, "dropped": 1}
+
+    engine.dispose()
+
+
+def test_list_audits_filters_and_paginates(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Audited", "email": "audited@example.com", "phone": "1"}
+    ).json()["id"]
+    admin_client.put(f"/accounts/{account_id}", json={"full_name": "Audited Twice"})
+
+    params = {"resource_type": "account", "resource_id": account_id, "limit": 1}
+    first = admin_client.get("/audits", params=params).json()
+    assert [a["action"] for a in first["items"]] == ["create_account"]
+    assert first["items"][0]["actor"] == "admin_test"
+
+    second = admin_client.get("/audits", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [a["action"] for a in second["items"]] == ["update_account"]
+    assert second["items"][0]["new"]["full_name"] == "Audited Twice"
+    assert second["next_cursor"] is None
+
+    none = admin_client.get(
+        "/audits", params={"resource_id": account_id, "created_to": "2000-01-01T00:00:00Z"}
+    ).json()
+    assert none["items"] == []
+
+
+def test_export_audits_streams_ndjson(admin_client):
+    for i in range(3):
+        admin_client.post(
+            "/accounts",
+            json={"full_name": f"Export {i}", "email": f"export{i}@example.com", "phone": "1"},
+        )
+
+    response = admin_client.get(
+        "/audits/export", params={"action": "create_account", "actor": "admin_test"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    emails = {row["new"]["email"] for row in rows}
+    assert {f"export{i}@example.com" for i in range(3)} <= emails
+
+
+def test_operator_cannot_read_audits(operator_client):
+    assert operator_client.get("/audits").status_code == status.HTTP_403_FORBIDDEN
+    assert operator_client.get("/audits/export").status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_retention_archives_old_audits_and_keeps_them_searchable(admin_client, db, tmp_path):
+    archive = AuditArchive(tmp_path)
+    app.dependency_overrides[get_audit_archive] = lambda: archive
+
+    now = datetime.now(timezone.utc)
+    for days_ago in (100, 100, 99, 1):
+        entry = build_audit("archivist", "retention_action", "test", "r1")
+        entry.created_at = now - timedelta(days=days_ago)
+        db.add(entry)
+    db.commit()
+
+    assert archive_audits(db, archive, retention_days=30, batch_size=2) == 3
+
+    # Old rows left the live table; segments are partitioned by day with a sidecar index
+    live = db.query(Audit).filter(Audit.action == "retention_action").all()
+    assert len(live) == 1
+    assert sum(s.count for s in archive.segments()) == 3
+    assert len({s.day for s in archive.segments()}) == 2
+    assert all(s.path.exists() and s.actors == {"archivist"} for s in archive.segments())
+
+    params = {"action": "retention_action", "limit": 2}
+    assert len(admin_client.get("/audits", params=params).json()["items"]) == 1
+
+    # Archived and live entries page together in (created_at, id) order
+    params["include_archived"] = True
+    first = admin_client.get("/audits", params=params).json()
+    second = admin_client.get("/audits", params={**params, "cursor": first["next_cursor"]}).json()
+    items = first["items"] + second["items"]
+    assert len(items) == 4
+    assert [a["created_at"] for a in items] == sorted(a["created_at"] for a in items)
+    assert second["next_cursor"] is None
+
+    exported = admin_client.get("/audits/export", params={"action": "retention_action"}).text
+    assert len(exported.splitlines()) == 1
+
+    exported = admin_client.get(
+        "/audits/export", params={"action": "retention_action", "include_archived": True}
+    ).text
+    assert len(exported.splitlines()) == 4
+
+    # Segments that cannot match are skipped using the sidecar index alone
+    assert archive.search(AuditFilter(actor="nobody")) == []
+
+
+def test_archive_readers_see_segments_written_by_other_processes(tmp_path):
+    reader, writer = AuditArchive(tmp_path), AuditArchive(tmp_path)
+    assert reader.segments() == []
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def audits(offsets):
+        return [
+            AuditResponse(
+                id=uuid4(),
+                action="shared_action",
+                resource_type="test",
+                created_at=start + timedelta(minutes=m),
+            )
+            for m in offsets
+        ]
+
+    # Two segments of one day with interleaved keys, as a re-run batch can leave
+    writer.write_segment(start.date(), audits([0, 2, 4]))
+    writer.write_segment(start.date(), audits([1, 3, 5]))
+
+    # No waiting for a cache to expire: the new manifest invalidates it at once
+    assert len(reader.segments()) == 2
+
+    first = reader.search(AuditFilter(), limit=4)
+    after = (first[-1].created_at.replace(tzinfo=None), first[-1].id)
+    rest = reader.search(AuditFilter(), after=after, limit=4)
+    assert [a.created_at.minute for a in first + rest] == [0, 1, 2, 3, 4, 5]
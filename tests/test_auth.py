@@ -1,8 +1,21 @@
-from datetime import timedelta
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
 
 from fastapi import status
+from passlib.context import CryptContext
 
-from app.core.security import create_access_token
+from app.core.security import (
+    PasswordHasher,
+    TokenCache,
+    create_access_token,
+    hash_password,
+)
+from app.main import app
+from app.models.auth import RefreshToken
+from app.models.user import User
+from app.schemas.user import UserRole
+from app.services.auth_service import purge_refresh_tokens
 
 
 def test_unauthenticated_access_denied(client):
@@ -63,6 +76,125 @@ def test_malformed_and_tampered_token_returns_401(client, admin_token):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
     # Tampered token
-    tampered = admin_token[:-1] + ("a" if admin_token[-1] != "a" else "b")
+    # (the last base64url character may only carry padding bits, so alter the first)
+    head, signature = admin_token.rsplit(".", 1)
+    tampered = f"{head}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
     response = client.get("/accounts", headers={"Authorization": f"Bearer {tampered}"})
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_verified_tokens_are_cached(client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    client.get("/accounts", headers=headers)
+    before = client.get("/metrics").json()["token_cache"]
+
+    client.get("/accounts", headers=headers)
+    after = client.get("/metrics").json()["token_cache"]
+
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+def test_token_cache_entries_expire_with_token():
+    cache = TokenCache(maxsize=2)
+
+    cache.put("expired", {"sub": "a", "exp": time.time() - 1})
+    cache.put("valid", {"sub": "b", "exp": time.time() + 60})
+
+    assert cache.get("expired") is None
+    assert cache.get("valid")["sub"] == "b"
+
+    # Least recently used entries are evicted beyond maxsize
+    cache.put("other", {"sub": "c", "exp": time.time() + 60})
+    cache.put("newest", {"sub": "d", "exp": time.time() + 60})
+    assert cache.get("valid") is None
+    assert cache.stats()["size"] == 2
+
+
+def test_login_rehashes_password_with_outdated_cost(client, db):
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("rehash123")
+    user = User(username="rehash_test", password_hash=weak_hash, role=UserRole.OPERATOR)
+    db.add(user)
+    db.commit()
+
+    response = client.post("/auth/login", json={"username": "rehash_test", "password": "rehash123"})
+    assert response.status_code == status.HTTP_200_OK
+
+    db.refresh(user)
+    assert user.password_hash != weak_hash
+    assert user.password_hash.startswith("$2b$12$")
+
+    # The upgraded hash keeps working
+    response = client.post("/auth/login", json={"username": "rehash_test", "password": "rehash123"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_login_rejected_with_retry_after_when_saturated(client, monkeypatch):
+    hasher = app.state.password_hasher
+    monkeypatch.setattr(hasher, "max_pending", 0)
+
+    response = client.post("/auth/login", json={"username": "admin_test", "password": "admin123"})
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/metrics").json()["password_hasher"]["rejected"] >= 1
+
+
+def test_password_hasher_verifies_in_process_pool():
+    hasher = PasswordHasher(workers=1, max_pending=4, retry_after=1)
+    hasher.start()
+
+    try:
+        hashed = hash_password("pool123")
+        assert asyncio.run(hasher.verify_and_update("pool123", hashed)) == (True, None)
+        assert asyncio.run(hasher.verify_and_update("wrong", hashed)) == (False, None)
+
+    finally:
+        hasher.shutdown()
+
+
+def test_refresh_token_rotates_exactly_once(client):
+    login = client.post("/auth/login", json={"username": "admin_test", "password": "admin123"})
+    old_token = login.json()["refresh_token"]
+
+    response = client.post("/auth/refresh", json={"refresh_token": old_token})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user"]["username"] == "admin_test"
+    new_token = response.json()["refresh_token"]
+    assert new_token != old_token
+
+    # The rotated token is spent; its replacement is live
+    response = client.post("/auth/refresh", json={"refresh_token": old_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["message"] == "Invalid refresh token"
+
+    response = client.post("/auth/refresh", json={"refresh_token": new_token})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_expired_refresh_token_is_rejected(client, db):
+    admin = db.query(User).filter(User.username == "admin_test").one()
+    token = RefreshToken(user_id=admin.id, expires_at=datetime.now(timezone.utc) - timedelta(1))
+    db.add(token)
+    db.commit()
+
+    response = client.post("/auth/refresh", json={"refresh_token": str(token.id)})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["message"] == "Refresh token expired"
+
+
+def test_sweeper_purges_revoked_and_expired_tokens(db):
+    admin = db.query(User).filter(User.username == "admin_test").one()
+    now = datetime.now(timezone.utc)
+
+    live = RefreshToken(user_id=admin.id, expires_at=now + timedelta(days=1))
+    db.add(live)
+    db.add_all(
+        [RefreshToken(user_id=admin.id, expires_at=now - timedelta(days=1)) for _ in range(3)]
+        + [RefreshToken(user_id=admin.id, expires_at=now + timedelta(days=1), revoked=1)]
+    )
+    db.commit()
+
+    assert purge_refresh_tokens(db, batch_size=2) >= 4
+    assert [t.id for t in db.query(RefreshToken).all()] == [live.id]
@@ -1,6 +1,30 @@
-from fastapi import status
+import threading
+import time
 
+from fastapi import status
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.account import Account
+from app.models.audit import Audit
+from app.models.line import Line
+from app.schemas.job import JobStatus
 from app.schemas.line import LineStatus
+from app.services import line_service
+
+
+def wait_for_job(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value):
+            return job
+
+        time.sleep(0.05)
+
+    raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
 
 
 def test_commission_line(admin_client):
@@ -22,11 +46,17 @@ def test_commission_line(admin_client):
     assert line_response.json()["status"] == LineStatus.PROVISIONED
     line_id = line_response.json()["id"]
 
-    # Commission the line
+    # Commission the line (queued, returns immediately)
     commission_response = admin_client.post(f"/lines/{line_id}/commission")
 
-    assert commission_response.status_code == status.HTTP_200_OK
-    assert commission_response.json()["status"] == LineStatus.ACTIVE.value
+    assert commission_response.status_code == status.HTTP_202_ACCEPTED
+    job = commission_response.json()
+    assert job["status"] in (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+    assert job["resource_id"] == line_id
+
+    job = wait_for_job(admin_client, job["id"])
+    assert job["status"] == JobStatus.SUCCEEDED.value
+    assert job["result"]["status"] == LineStatus.ACTIVE.value
 
 
 def test_commissioning_rejects_invalid_transitions(admin_client):
@@ -49,8 +79,10 @@ def test_commissioning_rejects_invalid_transitions(admin_client):
 
     # First Commission (Should succeed)
     first_commission_response = admin_client.post(f"/lines/{line_id}/commission")
-    assert first_commission_response.status_code == status.HTTP_200_OK
-    assert first_commission_response.json()["status"] == LineStatus.ACTIVE
+    assert first_commission_response.status_code == status.HTTP_202_ACCEPTED
+
+    job = wait_for_job(admin_client, first_commission_response.json()["id"])
+    assert job["result"]["status"] == LineStatus.ACTIVE
 
     # Second Commission (Should fail)
     second_commission_response = admin_client.patch(
@@ -60,6 +92,10 @@ def test_commissioning_rejects_invalid_transitions(admin_client):
     # We expect a 400 Bad Request because the state transition is invalid
     assert second_commission_response.status_code == status.HTTP_400_BAD_REQUEST
 
+    # An already active line cannot be queued for commissioning again
+    third_commission_response = admin_client.post(f"/lines/{line_id}/commission")
+    assert third_commission_response.status_code == status.HTTP_400_BAD_REQUEST
+
 
 def test_concurrent_commission(admin_client):
     # Create an account
@@ -96,5 +132,117 @@ def test_concurrent_commission(admin_client):
     t2.join()
 
     responses = {r.status_code for r in results}  # type: ignore
-    assert status.HTTP_200_OK in responses
-    assert status.HTTP_400_BAD_REQUEST in responses
+    assert status.HTTP_202_ACCEPTED in responses
+    assert status.HTTP_409_CONFLICT in responses
+
+
+def test_get_unknown_job_returns_404(operator_client):
+    response = operator_client.get("/jobs/00000000-0000-0000-0000-000000000000")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_batch_commission(admin_client):
+    acc_response = admin_client.post(
+        "/accounts", json={"full_name": "Batch Test", "email": "batch@test.com", "phone": "111"}
+    )
+
+    assert acc_response.status_code == status.HTTP_200_OK
+    account_id = acc_response.json()["id"]
+
+    line_ids = []
+    for msisdn in ("600000001", "600000002", "600000003"):
+        line_response = admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": msisdn, "plan_name": "Batch"}
+        )
+        assert line_response.status_code == status.HTTP_200_OK
+        line_ids.append(line_response.json()["id"])
+
+    # One line is already active and cannot be commissioned again
+    admin_client.patch(f"/lines/{line_ids[2]}/status", json={"status": LineStatus.ACTIVE.value})
+    missing_id = "00000000-0000-0000-0000-000000000000"
+
+    batch_response = admin_client.post(
+        "/lines/commission:batch", json={"line_ids": line_ids + [missing_id]}
+    )
+
+    assert batch_response.status_code == status.HTTP_202_ACCEPTED
+
+    job = wait_for_job(admin_client, batch_response.json()["id"])
+    assert job["status"] == JobStatus.SUCCEEDED.value
+
+    report = job["result"]
+    assert report["total"] == 4
+    assert report["succeeded"] == 2
+    assert report["failed"] == 2
+
+    results = {r["line_id"]: r for r in report["results"]}
+    assert results[line_ids[0]]["success"] and results[line_ids[1]]["success"]
+    assert results[line_ids[2]]["status"] == LineStatus.ACTIVE.value
+    assert not results[line_ids[2]]["success"]
+    assert results[missing_id]["error"] == "Line not found"
+
+    lines = admin_client.get(f"/accounts/{account_id}/lines").json()["items"]
+    assert {line["status"] for line in lines} == {LineStatus.ACTIVE.value}
+    assert {line["version"] for line in lines} == {2}  # bulk activation bumps versions too
+
+    # The audit's new state is the row as the UPDATE left it
+    (audit,) = admin_client.get(
+        "/audits", params={"action": "commission_line", "resource_id": line_ids[0]}
+    ).json()["items"]
+    assert (audit["old"]["status"], audit["new"]["status"]) == ("PROVISIONED", "ACTIVE")
+    assert (audit["old"]["version"], audit["new"]["version"]) == (1, 2)
+
+
+def test_batch_activation_is_isolated_from_concurrent_writes(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'lines.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        account = Account(full_name="Race", email="race@example.com", phone="1")
+        db.add(account)
+        db.flush()
+        line = Line(
+            account_id=account.id,
+            msisdn="+254796000001",
+            msisdn_e164="+254796000001",
+            plan_name="P",
+        )
+        db.add(line)
+        db.commit()
+        line_id = line.id
+
+    def suspend():
+        with Session() as other:
+            other.query(Line).filter(
+                Line.id == line_id, Line.status == LineStatus.PROVISIONED
+            ).update({"status": LineStatus.SUSPENDED})
+            other.commit()
+
+    writer = threading.Thread(target=suspend)
+
+    def interleave(conn, cursor, statement, *args):
+        # After the snapshot is read, just before the guarded UPDATE: let another writer
+        # in, if it can get in
+        if statement.startswith("UPDATE lines") and "IS NULL" not in statement and not writer.ident:
+            writer.start()
+            writer.join(timeout=0.5)
+
+    event.listen(engine, "before_cursor_execute", interleave)
+    try:
+        (result,) = line_service._activate_lines(Session, [line_id], actor="race")
+    finally:
+        event.remove(engine, "before_cursor_execute", interleave)
+        writer.join()
+
+    # The suspension waited for the activation to commit, and then no longer applied
+    assert (result.success, result.status) == (True, LineStatus.ACTIVE)
+    with Session() as db:
+        assert db.get(Line, line_id).status == LineStatus.ACTIVE
+        (audit,) = db.query(Audit).all()
+    assert (audit.old["status"], audit.new["status"]) == ("PROVISIONED", "ACTIVE")
+
+    engine.dispose()
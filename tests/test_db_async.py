@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.security import hash_password
+from app.db.base import Base
+from app.db.session import get_db, get_session_factory
+from app.main import app
+from app.models.user import User
+from app.schemas.user import UserRole
+from tests.test_commissioning import wait_for_job
+
+
+@pytest.fixture
+def async_client(tmp_path, monkeypatch):
+    """A client whose request sessions are AsyncSessions on aiosqlite, as with DB_ASYNC=true."""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(settings, "COMMISSION_DELAY_SECONDS", 0)
+
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(sync_engine) as db:
+        db.add(
+            User(
+                username="async_admin", password_hash=hash_password("async123"), role=UserRole.ADMIN
+            )
+        )
+        db.commit()
+
+    AsyncTestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    sessions: list[AsyncSession] = []
+
+    async def override_get_db():
+        async with AsyncTestingSession() as db:
+            sessions.append(db)
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(bind=sync_engine)
+
+    with TestClient(app) as c:
+        c.sessions = sessions
+        yield c
+
+    app.dependency_overrides.clear()
+    sync_engine.dispose()
+
+
+def test_async_mode_serves_requests(async_client):
+    login = async_client.post(
+        "/auth/login", json={"username": "async_admin", "password": "async123"}
+    ).json()
+    async_client.headers.update({"Authorization": f"Bearer {login['access_token']}"})
+
+    account = async_client.post(
+        "/accounts", json={"full_name": "Async", "email": "async@example.com", "phone": "1"}
+    ).json()
+    assert async_client.get(f"/accounts/{account['id']}").json()["email"] == "async@example.com"
+    assert len(async_client.get("/accounts").json()["items"]) == 1
+
+    line = async_client.post(
+        f"/accounts/{account['id']}/lines", json={"msisdn": "700000001", "plan_name": "Basic"}
+    ).json()
+    page = async_client.get(f"/accounts/{account['id']}/lines").json()
+    assert [item["id"] for item in page["items"]] == [line["id"]]
+
+    # Background jobs keep using the sync engine against the same database
+    job = async_client.post(f"/lines/{line['id']}/commission").json()
+    assert wait_for_job(async_client, job["id"])["status"] == "SUCCEEDED"
+
+    response = async_client.patch(f"/lines/{line['id']}/status", json={"status": "SUSPENDED"})
+    assert response.json()["status"] == "SUSPENDED"
+    assert response.json()["version"] == 3  # read back on the event loop, never lazy-loaded
+
+    account = async_client.get(f"/accounts/{line['account_id']}?include=lines").json()
+    assert [item["id"] for item in account["lines"]] == [line["id"]]
+
+    response = async_client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+
+    assert async_client.sessions
+    assert all(isinstance(db, AsyncSession) for db in async_client.sessions)
+
+
+def test_sync_mode_reads_responses_off_the_event_loop(admin_client, db):
+    # Services commit, which expires what they return; reading it back on the loop
+    # would reload it there with a blocking query
+    on_loop = []
+
+    def record(conn, cursor, statement, *args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(statement)
+        except RuntimeError:
+            pass
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        account = admin_client.post(
+            "/accounts", json={"full_name": "Sync", "email": "sync@example.com", "phone": "1"}
+        ).json()
+        admin_client.put(f"/accounts/{account['id']}", json={"full_name": "Sync Twice"})
+
+        line = admin_client.post(
+            f"/accounts/{account['id']}/lines", json={"msisdn": "700000002", "plan_name": "Basic"}
+        ).json()
+        admin_client.patch(f"/lines/{line['id']}/status", json={"status": "SUSPENDED"})
+        response = admin_client.delete(f"/lines/{line['id']}")
+
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.json()["id"] == line["id"]
+    assert on_loop == []
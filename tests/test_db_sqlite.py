@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import sqlite as sqlite_profile
+from app.db.sqlite import DataVersionProbe, LockMetrics, configure_engine, retry_on_lock
+
+
+def locked_error() -> OperationalError:
+    return OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = LockMetrics()
+    monkeypatch.setattr(sqlite_profile, "lock_metrics", metrics)
+    monkeypatch.setattr(settings, "DB_LOCK_RETRY_BASE_MS", 1)
+    return metrics
+
+
+def test_engine_profile_is_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    configure_engine(engine)
+
+    with engine.connect() as conn:
+        pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()  # noqa: E731
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert pragma("cache_size") == settings.SQLITE_CACHE_SIZE
+
+    engine.dispose()
+
+
+def test_retry_on_lock_backs_off_then_succeeds(metrics):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise locked_error()
+        return "done"
+
+    assert retry_on_lock(flaky) == "done"
+    assert len(attempts) == 3
+    assert metrics.stats()["retries"] == 2
+
+
+def test_retry_on_lock_gives_up_and_ignores_other_errors(metrics, monkeypatch):
+    monkeypatch.setattr(settings, "DB_LOCK_RETRIES", 2)
+
+    def always_locked():
+        raise locked_error()
+
+    with pytest.raises(OperationalError):
+        retry_on_lock(always_locked)
+    assert metrics.stats()["exhausted"] == 1
+
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: x"))
+
+    with pytest.raises(OperationalError):
+        retry_on_lock(broken)
+    assert len(calls) == 1
+
+
+def test_lock_errors_are_counted(tmp_path, metrics, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 10)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'locks.db'}")
+    configure_engine(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with engine.connect() as writer, engine.connect() as other:
+        writer.exec_driver_sql("BEGIN IMMEDIATE")
+
+        with pytest.raises(OperationalError):
+            other.exec_driver_sql("BEGIN IMMEDIATE")
+
+        writer.rollback()
+
+    assert metrics.stats()["errors"] == 1
+    engine.dispose()
+
+
+def test_data_version_probe_sees_other_connections_commit(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'watched.db'}")
+    configure_engine(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    probe = DataVersionProbe([engine])
+    assert probe.changed() is False
+    assert probe.changed() is False
+
+    # Stands in for a write made by another worker process
+    other = create_engine(f"sqlite:///{tmp_path / 'watched.db'}")
+    with other.begin() as conn:
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    assert probe.changed() is True
+    assert probe.changed() is False
+
+    probe.close()
+    other.dispose()
+    engine.dispose()
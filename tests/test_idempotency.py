@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.account import Account
+from app.models.idempotency import IdempotencyKey
+from app.services.idempotency_service import purge_idempotency_keys, run_idempotent
+
+
+def test_retried_create_is_replayed(admin_client, db):
+    def create(email, key):
+        return admin_client.post(
+            "/accounts",
+            json={"full_name": "Retry", "email": email, "phone": "1"},
+            headers={"Idempotency-Key": key},
+        )
+
+    first = create("retry@example.com", "create-1")
+    retry = create("retry@example.com", "create-1")
+
+    assert first.status_code == retry.status_code == status.HTTP_200_OK
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert db.query(Account).filter(Account.email == "retry@example.com").count() == 1
+
+    # The key belongs to the first request
+    response = create("other@example.com", "create-1")
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    # Failures are not stored; the key is free for the next attempt
+    assert create("retry@example.com", "create-2").status_code == status.HTTP_409_CONFLICT
+    assert db.get(IdempotencyKey, ("admin_test", "create-2")) is None
+
+
+def test_retried_commission_returns_the_same_job(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Retry", "email": "job@example.com", "phone": "1"}
+    ).json()["id"]
+    line_id = admin_client.post(
+        f"/accounts/{account_id}/lines",
+        json={"msisdn": "+254797000001", "plan_name": "Basic"},
+        headers={"Idempotency-Key": "line-1"},
+    ).json()["id"]
+
+    def commission():
+        return admin_client.post(
+            f"/lines/{line_id}/commission", headers={"Idempotency-Key": "commission-1"}
+        )
+
+    first, retry = commission(), commission()
+    assert first.status_code == retry.status_code == status.HTTP_202_ACCEPTED
+    assert retry.json()["id"] == first.json()["id"]
+
+
+def make_request(body: bytes) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/accounts/", "query_string": b""}
+    return Request({**scope, "headers": []}, receive)
+
+
+def test_concurrent_duplicate_waits_for_the_first_request(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}")
+    IdempotencyKey.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    calls = []
+    finish = asyncio.Event()
+
+    async def call():
+        calls.append(1)
+        await finish.wait()
+        return JSONResponse({"calls": len(calls)})
+
+    async def main():
+        actor = {"username": "admin_test"}
+        with Session() as first_db, Session() as second_db:
+            first = asyncio.create_task(
+                run_idempotent(first_db, make_request(b"{}"), actor, "k", call)
+            )
+            await asyncio.sleep(0.1)
+            second = asyncio.create_task(
+                run_idempotent(second_db, make_request(b"{}"), actor, "k", call)
+            )
+
+            await asyncio.sleep(0.2)
+            assert not second.done()
+
+            finish.set()
+            return await first, await second
+
+    first, second = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert first.body == second.body == b'{"calls":1}'
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+    engine.dispose()
+
+
+def test_expired_keys_are_purged(db):
+    now = datetime.now(timezone.utc)
+    for i, expires_at in enumerate([now - timedelta(seconds=1)] * 3 + [now + timedelta(hours=1)]):
+        db.add(IdempotencyKey(actor="a", key=str(i), fingerprint=b"f", expires_at=expires_at))
+    db.commit()
+
+    assert purge_idempotency_keys(db, batch_size=2) == 3
+    assert [k.key for k in db.query(IdempotencyKey)] == ["3"]
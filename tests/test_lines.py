@@ -1,6 +1,18 @@
+import json
+import threading
+from uuid import UUID, uuid4
+
 from fastapi import status
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
 
+from app.core.bloom import BloomFilter
+from app.db.base import Base
+from app.models.account import Account
+from app.models.audit import Audit
+from app.models.line import Line
 from app.schemas.line import LineStatus
+from app.services import line_service
 
 
 def test_create_line(admin_client):
@@ -20,3 +32,397 @@ def test_create_line(admin_client):
 
     assert line_response.status_code == status.HTTP_200_OK
     assert line_response.json()["status"] == LineStatus.PROVISIONED.value
+
+
+def test_create_lines_bulk(admin_client):
+    acc_response = admin_client.post(
+        "/accounts",
+        json={"full_name": "Bulk Owner", "email": "bulk@example.com", "phone": "555222"},
+    )
+
+    assert acc_response.status_code == status.HTTP_200_OK
+    account_id = acc_response.json()["id"]
+
+    # Pre-existing line conflicts with the bulk request
+    admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "800000001", "plan_name": "Basic"}
+    )
+
+    bulk_response = admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={
+            "lines": [
+                {"msisdn": "800000001", "plan_name": "Basic"},
+                {"msisdn": "800000002", "plan_name": "Basic"},
+                {"msisdn": "800000003", "plan_name": "Gold"},
+                {"msisdn": "800000003", "plan_name": "Gold"},
+            ]
+        },
+    )
+
+    assert bulk_response.status_code == status.HTTP_200_OK
+    report = bulk_response.json()
+    assert report["total"] == 4
+    assert report["created"] == 2
+    assert report["conflicts"] == 2
+    assert [r["success"] for r in report["results"]] == [False, True, True, False]
+    assert report["results"][1]["line"]["status"] == LineStatus.PROVISIONED.value
+
+    lines = admin_client.get(f"/accounts/{account_id}/lines").json()["items"]
+    assert sorted(line["msisdn"] for line in lines) == ["800000001", "800000002", "800000003"]
+
+
+def test_create_lines_bulk_unknown_account(admin_client):
+    bulk_response = admin_client.post(
+        "/accounts/00000000-0000-0000-0000-000000000000/lines:bulk",
+        json={"lines": [{"msisdn": "800000009", "plan_name": "Basic"}]},
+    )
+
+    assert bulk_response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_lines_cursor_pagination(admin_client):
+    acc_response = admin_client.post(
+        "/accounts",
+        json={"full_name": "Paged Lines", "email": "paged-lines@example.com", "phone": "1"},
+    )
+    account_id = acc_response.json()["id"]
+
+    # Bulk-created lines share created_at, so paging relies on the id tie-breaker
+    msisdns = [f"81000000{i}" for i in range(5)]
+    admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": m, "plan_name": "Basic"} for m in msisdns]},
+    )
+
+    first = admin_client.get(f"/accounts/{account_id}/lines", params={"limit": 3}).json()
+    assert len(first["items"]) == 3
+    assert first["next_cursor"]
+
+    second = admin_client.get(
+        f"/accounts/{account_id}/lines", params={"limit": 3, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["items"]) == 2
+    assert second["next_cursor"] is None
+
+    assert sorted(line["msisdn"] for line in first["items"] + second["items"]) == msisdns
+
+
+def test_cached_line_pages_follow_line_changes(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Cached Lines", "email": "cl@example.com", "phone": "1"}
+    ).json()["id"]
+
+    def statuses():
+        page = admin_client.get(f"/accounts/{account_id}/lines").json()
+        return [item["status"] for item in page["items"]]
+
+    assert statuses() == []
+
+    line = admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "555000111", "plan_name": "Basic"}
+    ).json()
+    assert statuses() == [LineStatus.PROVISIONED]
+
+    admin_client.patch(f"/lines/{line['id']}/status", json={"status": "SUSPENDED"})
+    assert statuses() == [LineStatus.SUSPENDED]
+
+    admin_client.delete(f"/lines/{line['id']}")
+    assert statuses() == [LineStatus.DELETED]
+
+    admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": "555000112", "plan_name": "Basic"}]},
+    )
+    assert len(statuses()) == 2
+
+
+def test_conditional_get_lines_page(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "ETag Lines", "email": "etl@example.com", "phone": "1"}
+    ).json()["id"]
+    admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": "556000001", "plan_name": "Basic"}]},
+    )
+
+    response = admin_client.get(f"/accounts/{account_id}/lines")
+    etag = response.headers["ETag"]
+    line = response.json()["items"][0]
+    assert line["version"] == 1
+
+    url = f"/accounts/{account_id}/lines"
+    assert admin_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    changed = admin_client.patch(f"/lines/{line['id']}/status", json={"status": "SUSPENDED"})
+    assert changed.json()["version"] == 2
+
+    response = admin_client.get(url, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"][0]["version"] == 2
+
+
+def test_list_lines_streams_ndjson(admin_client):
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Stream Lines", "email": "sl@example.com", "phone": "1"}
+    ).json()["id"]
+    admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": f"557000{i:03d}", "plan_name": "Basic"} for i in range(3)]},
+    )
+
+    ndjson = {"Accept": "application/x-ndjson"}
+    response = admin_client.get(f"/accounts/{account_id}/lines", headers=ndjson)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert sorted(json.loads(line)["msisdn"] for line in response.text.splitlines()) == [
+        f"557000{i:03d}" for i in range(3)
+    ]
+
+    missing = admin_client.get(f"/accounts/{uuid4()}/lines", headers=ndjson)
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_line_by_msisdn(admin_client, operator_client, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.MSISDN_DEFAULT_COUNTRY_CODE", "254")
+
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Msisdn", "email": "msisdn@example.com", "phone": "1"}
+    ).json()["id"]
+    line = admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "0712 345-678", "plan_name": "Basic"}
+    ).json()
+    assert line["msisdn"] == "0712 345-678"
+
+    for written in ("+254712345678", "254712345678", "00254 712 345678"):
+        response = operator_client.get(f"/lines/by-msisdn/{written}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == line["id"]
+
+    # Another spelling of the same number is a duplicate
+    response = admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "+254712345678", "plan_name": "Basic"}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    assert operator_client.get("/lines/by-msisdn/254700000000").status_code == 404
+    assert operator_client.get("/lines/by-msisdn/12ab").status_code == 400
+
+    response = admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "not a number", "plan_name": "Basic"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_msisdn_filter_spares_failed_inserts_and_needless_checks(admin_client, db, monkeypatch):
+    msisdn_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    msisdn_filter.mark_ready()
+    monkeypatch.setattr(line_service, "msisdn_filter", msisdn_filter)
+
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Filter", "email": "filter@example.com", "phone": "1"}
+    ).json()["id"]
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "lines" in statement and statement.lstrip().startswith(("SELECT", "INSERT")):
+            statements.append(statement.split()[0])
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", capture)
+
+    try:
+        # A new MSISDN is inserted without a duplicate check first
+        admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": "+15550001", "plan_name": "Basic"}
+        )
+        assert statements[0] == "INSERT"
+
+        # A duplicate is turned away by a read, never reaching the INSERT
+        statements.clear()
+        response = admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": "+15550001", "plan_name": "Basic"}
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert statements == ["SELECT"]
+
+        # Bulk imports check every MSISDN with one read, whatever the filter says
+        statements.clear()
+        result = admin_client.post(
+            f"/accounts/{account_id}/lines:bulk",
+            json={
+                "lines": [{"msisdn": m, "plan_name": "Basic"} for m in ("+15550001", "+15550002")]
+            },
+        ).json()
+        assert (result["created"], result["conflicts"]) == (1, 1)
+        assert statements == ["SELECT", "INSERT"]
+
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert msisdn_filter.stats()["count"] == 2
+    assert msisdn_filter.stats()["negatives"] >= 1  # the first single create
+
+
+def test_bulk_import_reports_numbers_the_filter_has_not_seen(admin_client, db, monkeypatch):
+    msisdn_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    msisdn_filter.mark_ready()
+    monkeypatch.setattr(line_service, "msisdn_filter", msisdn_filter)
+
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Other", "email": "other@example.com", "phone": "1"}
+    ).json()["id"]
+
+    # As if another worker process had created it: the filter never saw the number
+    db.add(
+        Line(
+            account_id=UUID(account_id),
+            msisdn="+15550101",
+            msisdn_e164="+15550101",
+            plan_name="Basic",
+            status=LineStatus.PROVISIONED,
+        )
+    )
+    db.commit()
+    assert not msisdn_filter.might_contain("+15550101")
+
+    response = admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": m, "plan_name": "Basic"} for m in ("+15550101", "+15550102")]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert (report["created"], report["conflicts"]) == (1, 1)
+    assert [r["success"] for r in report["results"]] == [False, True]
+
+
+def test_bulk_status_update(admin_client):
+    def create_account(email):
+        return admin_client.post(
+            "/accounts", json={"full_name": "Bulk Status", "email": email, "phone": "1"}
+        ).json()["id"]
+
+    first, second = create_account("bs1@example.com"), create_account("bs2@example.com")
+    lines = {}
+    for account_id, msisdn, plan in (
+        (first, "+254799000001", "Gold"),
+        (first, "+254799000002", "Gold"),
+        (first, "+254799000003", "Silver"),
+        (second, "+254799000004", "Gold"),
+    ):
+        lines[msisdn] = admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": msisdn, "plan_name": plan}
+        ).json()
+
+    deleted = lines["+254799000002"]["id"]
+    admin_client.delete(f"/lines/{deleted}")
+
+    def bulk(**change):
+        response = admin_client.post("/lines/status:bulk", json=change)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        return response.json()
+
+    # Every Gold line; the deleted one cannot be suspended
+    result = bulk(status="SUSPENDED", plan_name="Gold")
+    assert (result["matched"], result["updated"], result["skipped"]) == (3, 2, 1)
+
+    # Selectors combine
+    result = bulk(status="ACTIVE", account_id=first, current_status="SUSPENDED")
+    assert (result["matched"], result["updated"]) == (1, 1)
+
+    page = admin_client.get(f"/accounts/{first}/lines").json()
+    statuses = {line["msisdn"]: (line["status"], line["version"]) for line in page["items"]}
+    assert statuses == {
+        "+254799000001": ("ACTIVE", 3),
+        "+254799000002": ("DELETED", 2),
+        "+254799000003": ("PROVISIONED", 1),
+    }
+
+    # One audit per changed line, with the old and new state
+    line_id = lines["+254799000001"]["id"]
+    audits = admin_client.get(
+        "/audits", params={"resource_type": "line", "resource_id": line_id}
+    ).json()["items"]
+    transitions = [
+        (a["old"]["status"], a["new"]["status"])
+        for a in audits
+        if a["action"] == "update_line_status"
+    ]
+    assert sorted(transitions) == [("PROVISIONED", "SUSPENDED"), ("SUSPENDED", "ACTIVE")]
+
+    # Nothing may become PROVISIONED again
+    result = bulk(status="PROVISIONED", line_ids=[line_id, deleted])
+    assert (result["matched"], result["updated"], result["skipped"]) == (2, 0, 2)
+
+    response = admin_client.post("/lines/status:bulk", json={"status": "SUSPENDED"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_bulk_status_update_is_isolated_from_concurrent_writes(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'lines.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    def gold_line(account_id, msisdn):
+        return Line(
+            account_id=account_id,
+            msisdn=msisdn,
+            msisdn_e164=msisdn,
+            plan_name="Gold",
+            status=LineStatus.ACTIVE,
+        )
+
+    with Session() as db:
+        account = Account(full_name="Race", email="race@example.com", phone="1")
+        db.add(account)
+        db.flush()
+        account_id = account.id
+        db.add_all([gold_line(account_id, "+254798000001"), gold_line(account_id, "+254798000002")])
+        db.commit()
+
+    def concurrent_writes():
+        # A line the bulk change would select, and a status change to a selected line
+        with Session() as other:
+            other.add(gold_line(account_id, "+254798000003"))
+            other.query(Line).filter(
+                Line.msisdn == "+254798000001", Line.status == LineStatus.ACTIVE
+            ).update({"status": LineStatus.SUSPENDED})
+            other.commit()
+
+    writer = threading.Thread(target=concurrent_writes)
+
+    def interleave(conn, cursor, statement, *args):
+        # After the old statuses are read, just before the UPDATE: let another writer in,
+        # if it can get in
+        if statement.startswith("UPDATE lines") and "IS NULL" not in statement and not writer.ident:
+            writer.start()
+            writer.join(timeout=0.5)
+
+    event.listen(engine, "before_cursor_execute", interleave)
+    try:
+        with Session() as db:
+            matched, changed = line_service.move_lines(
+                db, [Line.plan_name == "Gold"], LineStatus.DELETED, actor="race"
+            )
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", interleave)
+        writer.join()
+
+    assert (matched, len(changed)) == (2, 2)
+
+    with Session() as db:
+        statuses = {line.msisdn: line.status for line in db.query(Line)}
+        transitions = {(a.old["status"], a.new["status"]) for a in db.query(Audit)}
+
+    # The other writer waited for the bulk change to commit
+    assert statuses == {
+        "+254798000001": LineStatus.DELETED,
+        "+254798000002": LineStatus.DELETED,
+        "+254798000003": LineStatus.ACTIVE,
+    }
+    assert transitions == {("ACTIVE", "DELETED")}
+
+    engine.dispose()
@@ -0,0 +1,123 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+
+from app.core.exceptions import ConflictException
+from app.models.number_pool import NumberPool
+from app.services.number_pool_service import (
+    FreeRanges,
+    NumberAllocator,
+    number_allocator,
+)
+
+
+def create_pool(client, name, start, end):
+    return client.post("/number-pools", json={"name": name, "range_start": start, "range_end": end})
+
+
+def create_account(client, email):
+    return client.post(
+        "/accounts", json={"full_name": "Pool User", "email": email, "phone": "1"}
+    ).json()["id"]
+
+
+def test_allocate_lines_from_pool(admin_client, monkeypatch):
+    monkeypatch.setattr(number_allocator, "block_size", 2)
+
+    pool = create_pool(admin_client, "Nairobi", "+254 700 000 000", "+254700000004").json()
+    assert (pool["range_start"], pool["size"], pool["reserved"]) == ("+254700000000", 5, 0)
+
+    account_id = create_account(admin_client, "pool@example.com")
+
+    # A number already given out by hand is skipped, not handed out twice
+    admin_client.post(
+        f"/accounts/{account_id}/lines", json={"msisdn": "+254700000001", "plan_name": "Basic"}
+    )
+
+    allocated = []
+    for _ in range(4):
+        response = admin_client.post(
+            f"/accounts/{account_id}/lines:allocate",
+            json={"pool_id": pool["id"], "plan_name": "Basic"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        allocated.append(response.json()["msisdn"])
+
+    assert allocated == ["+254700000000", "+254700000002", "+254700000003", "+254700000004"]
+
+    response = admin_client.post(
+        f"/accounts/{account_id}/lines:allocate", json={"pool_id": pool["id"], "plan_name": "B"}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    pools = admin_client.get("/number-pools").json()["items"]
+    assert [(p["name"], p["reserved"]) for p in pools] == [("Nairobi", 5)]
+
+
+def test_allocation_failure_returns_the_number(admin_client):
+    pool_id = create_pool(admin_client, "Mombasa", "+254710000000", "+254710000009").json()["id"]
+
+    response = admin_client.post(
+        f"/accounts/{uuid4()}/lines:allocate", json={"pool_id": pool_id, "plan_name": "Basic"}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    account_id = create_account(admin_client, "returned@example.com")
+    line = admin_client.post(
+        f"/accounts/{account_id}/lines:allocate", json={"pool_id": pool_id, "plan_name": "Basic"}
+    ).json()
+    assert line["msisdn"] == "+254710000000"
+
+    response = admin_client.post(
+        f"/accounts/{account_id}/lines:allocate", json={"pool_id": str(uuid4()), "plan_name": "B"}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_number_pool_validation(admin_client, operator_client):
+    assert create_pool(admin_client, "Kisumu", "+254720000000", "+254720000099").status_code == 200
+
+    # Overlapping ranges and reused names conflict
+    response = create_pool(admin_client, "Kisumu 2", "+254720000050", "+254720000150")
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = create_pool(admin_client, "Kisumu", "+254721000000", "+254721000099")
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = create_pool(admin_client, "Backwards", "+254730000099", "+254730000000")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    response = create_pool(operator_client, "Operator", "+254740000000", "+254740000099")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_workers_reserve_disjoint_blocks(db):
+    pool = NumberPool(name="Shared", range_start=100, range_end=199, next_number=100)
+    db.add(pool)
+    db.commit()
+
+    # Two workers, each with its own in-memory allocator, drawing from one pool
+    workers = [NumberAllocator(block_size=10), NumberAllocator(block_size=10)]
+    taken = [workers[i % 2].take(db, pool.id) for i in range(100)]
+
+    assert sorted(taken) == list(range(100, 200))
+    assert all(worker.blocks == 5 for worker in workers)
+
+    with pytest.raises(ConflictException):
+        workers[0].take(db, pool.id)
+
+
+def test_free_ranges_merge_and_pop_in_order():
+    free = FreeRanges()
+    free.add(10, 12)
+    free.add(1, 3)
+    free.add(4, 9)  # joins both neighbours
+
+    assert len(free) == 12
+    assert [free.pop() for _ in range(12)] == list(range(1, 13))
+    assert free.pop() is None
+
+    free.add(5, 5)
+    free.add(3, 3)
+    assert [free.pop(), free.pop(), free.pop()] == [3, 5, None]
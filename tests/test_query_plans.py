@@ -0,0 +1,213 @@
+import re
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.account import Account
+from app.models.auth import RefreshToken
+from app.models.line import Line
+from app.services.auth_service import purge_refresh_tokens
+from app.services.idempotency_service import purge_idempotency_keys
+from tests.test_commissioning import wait_for_job
+
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)")
+KEYSET_WALK = re.compile(r"^SCAN \w+ USING (?:COVERING )?INDEX ix_\w+_created_at_id$")
+FTS_MATCH = re.compile(r"VIRTUAL TABLE INDEX \d+:\S*M")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR ORDER BY")
+PLANNED = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+@pytest.fixture
+def captured_queries(db):
+    engine = db.get_bind().engine
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(PLANNED):
+            params = parameters[0] if executemany and parameters else parameters
+            statements.append((statement, params))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(db, statement, params):
+    rows = db.get_bind().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).all()
+    return [row[3] for row in rows]
+
+
+def is_unbounded_scan(statement, step):
+    # The first page of a keyset listing walks its (created_at, id) index and stops at
+    # LIMIT; with a WHERE clause the same walk could pass over the whole table
+    if KEYSET_WALK.match(step) and "LIMIT" in statement and " WHERE " not in statement:
+        return False
+
+    # An FTS5 MATCH walks the full-text index
+    if FTS_MATCH.search(step):
+        return False
+
+    return bool(FULL_SCAN.match(step))
+
+
+def assert_indexed(db, statements):
+    assert statements, "no queries captured"
+
+    unique = {}
+    for statement, params in statements:
+        unique.setdefault(statement, params)
+
+    offenders = []
+    for statement, params in unique.items():
+        plan = query_plan(db, statement, params)
+
+        # Ranking full-text matches sorts them, but only them
+        ranked = any(FTS_MATCH.search(step) for step in plan)
+
+        if any(
+            is_unbounded_scan(statement, step) or (TEMP_SORT.search(step) and not ranked)
+            for step in plan
+        ):
+            offenders.append(f"{' '.join(statement.split())}\n    -> {plan}")
+
+    assert not offenders, "Queries without a usable index:\n" + "\n".join(offenders)
+
+
+def test_service_queries_use_indexes(admin_client, db, captured_queries, monkeypatch):
+    monkeypatch.setattr(settings, "COMMISSION_DELAY_SECONDS", 0)
+
+    # Auth
+    login = admin_client.post(
+        "/auth/login", json={"username": "admin_test", "password": "admin123"}
+    )
+    admin_client.post("/auth/refresh", json={"refresh_token": login.json()["refresh_token"]})
+
+    # Accounts
+    account_id = admin_client.post(
+        "/accounts", json={"full_name": "Plan User", "email": "plan@example.com", "phone": "1"}
+    ).json()["id"]
+    admin_client.get(f"/accounts/{account_id}")
+    admin_client.put(f"/accounts/{account_id}", json={"full_name": "Plan User 2"})
+
+    page = admin_client.get("/accounts", params={"limit": 1}).json()
+    admin_client.get("/accounts", params={"limit": 1, "cursor": page["next_cursor"]})
+
+    page = admin_client.get("/accounts/search", params={"q": "plan", "limit": 1}).json()
+    admin_client.get("/accounts/search", params={"q": "plan us", "cursor": page["next_cursor"]})
+
+    # Conditional GETs check row versions only
+    stale = {"If-None-Match": '"stale"'}
+    admin_client.get(f"/accounts/{account_id}", headers=stale)
+    admin_client.get("/accounts", params={"limit": 1, "cursor": page["next_cursor"]}, headers=stale)
+
+    # Lines
+    line_ids = [
+        admin_client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": msisdn, "plan_name": "Plan"}
+        ).json()["id"]
+        for msisdn in ("900000001", "900000002", "900000003")
+    ]
+    admin_client.post(
+        f"/accounts/{account_id}/lines:bulk",
+        json={"lines": [{"msisdn": "900000004", "plan_name": "Plan"}]},
+    )
+
+    page = admin_client.get(f"/accounts/{account_id}/lines", params={"limit": 1}).json()
+    admin_client.get(
+        f"/accounts/{account_id}/lines",
+        params={"limit": 1, "cursor": page["next_cursor"]},
+        headers=stale,
+    )
+
+    admin_client.get(f"/accounts/{account_id}", params={"include": "lines"})
+    admin_client.get("/accounts", params={"limit": 1, "include": "lines"})
+
+    admin_client.get("/lines/by-msisdn/900000001")
+
+    # Retries with an Idempotency-Key look it up by (actor, key); the sweep purges by expiry
+    for _ in range(2):
+        admin_client.post(
+            f"/accounts/{account_id}/lines",
+            json={"msisdn": "900000005", "plan_name": "Plan"},
+            headers={"Idempotency-Key": "plan-line"},
+        )
+    purge_idempotency_keys(db, batch_size=100)
+
+    # Number pools: reserving a block updates one pool by primary key
+    pool_id = admin_client.post(
+        "/number-pools",
+        json={"name": "Plan Pool", "range_start": "+254700000000", "range_end": "+254700000009"},
+    ).json()["id"]
+    admin_client.post(
+        f"/accounts/{account_id}/lines:allocate", json={"pool_id": pool_id, "plan_name": "Plan"}
+    )
+    page = admin_client.get("/number-pools", params={"limit": 1}).json()
+    admin_client.get("/number-pools", params={"limit": 1, "cursor": page["next_cursor"]})
+
+    admin_client.patch(f"/lines/{line_ids[0]}/status", json={"status": "SUSPENDED"})
+    admin_client.delete(f"/lines/{line_ids[0]}")
+
+    # Commissioning (single and batch)
+    job = admin_client.post(f"/lines/{line_ids[1]}/commission").json()
+    wait_for_job(admin_client, job["id"])
+
+    job = admin_client.post("/lines/commission:batch", json={"line_ids": [line_ids[2]]}).json()
+    assert wait_for_job(admin_client, job["id"])["status"] == "SUCCEEDED"
+
+    # Bulk status changes read the old statuses, then run one guarded UPDATE
+    for selector in (
+        {"plan_name": "Plan", "current_status": "ACTIVE"},
+        {"account_id": account_id},
+        {"line_ids": line_ids[1:]},
+    ):
+        admin_client.post("/lines/status:bulk", json={"status": "SUSPENDED", **selector})
+
+    # Closing the account cascades to its lines by account_id and status
+    admin_client.put(f"/accounts/{account_id}", json={"status": "CLOSED"})
+
+    # Audit log
+    for params in (
+        {"resource_type": "line", "resource_id": line_ids[0]},
+        {"actor": "admin_test", "created_from": "2000-01-01T00:00:00Z"},
+        {"action": "create_line"},
+        {"created_from": "2000-01-01T00:00:00Z", "created_to": "2100-01-01T00:00:00Z"},
+    ):
+        page = admin_client.get("/audits", params={**params, "limit": 1}).json()
+        admin_client.get("/audits", params={**params, "limit": 1, "cursor": page["next_cursor"]})
+        admin_client.get("/audits/export", params=params)
+
+    assert_indexed(db, list(captured_queries))
+
+
+def test_token_access_patterns_use_indexes(client, db, captured_queries):
+    now = datetime.now(timezone.utc)
+
+    # Session lookup and cleanup over refresh tokens
+    db.query(RefreshToken).filter(RefreshToken.user_id == uuid4()).all()
+    db.query(RefreshToken).filter(RefreshToken.revoked == 1).all()
+    db.query(RefreshToken).filter(RefreshToken.revoked == 0, RefreshToken.expires_at < now).all()
+    purge_refresh_tokens(db, batch_size=100)
+
+    assert_indexed(db, list(captured_queries))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        lambda db: db.query(Account).filter(Account.full_name == "unindexed").all(),
+        # Walks the whole plan_name index; LIMIT does not bound a LIKE '%...%' filter
+        lambda db: db.query(Line.plan_name)
+        .filter(Line.plan_name.like("%unindexed%"))
+        .limit(5)
+        .all(),
+    ],
+    ids=["full-scan", "filtered-index-walk"],
+)
+def test_full_scan_is_detected(client, db, captured_queries, query):
+    query(db)
+
+    with pytest.raises(AssertionError, match="without a usable index"):
+        assert_indexed(db, list(captured_queries))
@@ -0,0 +1,288 @@
+import json
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import get_db, get_session_factory
+from app.db.sharding import (
+    SHARDED_TABLES,
+    RoutedSession,
+    ShardKeyReconciler,
+    sharding_options,
+)
+from app.main import app
+from app.models.shard import ShardKey
+from tests.test_commissioning import wait_for_job
+
+SHARDS = 3
+
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch):
+    """An admin client backed by a global database plus three account shards."""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(settings, "COMMISSION_DELAY_SECONDS", 0)
+
+    def sqlite(name):
+        return create_engine(
+            f"sqlite:///{tmp_path / name}.db", connect_args={"check_same_thread": False}
+        )
+
+    global_engine = sqlite("global")
+    shard_engines = {f"shard{i}": sqlite(f"shard{i}") for i in range(SHARDS)}
+
+    Base.metadata.create_all(bind=global_engine)
+    for engine in shard_engines.values():
+        Base.metadata.create_all(bind=engine, tables=SHARDED_TABLES)
+
+    ShardedSession = sessionmaker(
+        class_=RoutedSession, autoflush=False, **sharding_options(global_engine, shard_engines)
+    )
+
+    def override_get_db():
+        with ShardedSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: ShardedSession
+
+    token, _ = create_access_token({"sub": "admin_test", "role": "ADMIN"}, timedelta(minutes=5))
+    with TestClient(app) as client:
+        client.headers.update({"Authorization": f"Bearer {token}"})
+        yield client, ShardedSession, shard_engines
+
+    app.dependency_overrides.clear()
+
+
+def shard_counts(shard_engines, table):
+    with_rows = {}
+    for name, engine in shard_engines.items():
+        with engine.connect() as conn:
+            with_rows[name] = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    return with_rows
+
+
+def create_accounts(client, count):
+    return [
+        client.post(
+            "/accounts", json={"full_name": f"S{i}", "email": f"s{i}@example.com", "phone": "1"}
+        ).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_accounts_are_spread_over_shards(sharded):
+    client, _, shard_engines = sharded
+    ids = create_accounts(client, 12)
+
+    counts = shard_counts(shard_engines, "accounts")
+    assert sum(counts.values()) == 12
+    assert sum(1 for count in counts.values() if count) > 1, counts  # spread, not all on one
+
+    for account_id in ids[:3]:
+        assert client.get(f"/accounts/{account_id}").json()["id"] == account_id
+
+
+def test_account_lists_merge_every_shard(sharded):
+    client, _, _ = sharded
+    ids = create_accounts(client, 12)
+
+    # Scatter-gather pages come back in global (created_at, id) order
+    items, cursor = [], None
+    while True:
+        page = client.get("/accounts", params={"limit": 5, "cursor": cursor}).json()
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [a["id"] for a in items] == ids
+
+    # Streaming reads every shard; rows arrive shard by shard
+    streamed = client.get("/accounts", headers={"Accept": "application/x-ndjson"}).text
+    assert sorted(json.loads(line)["id"] for line in streamed.splitlines()) == sorted(ids)
+
+    # Search merges every shard's best matches
+    found = client.get("/accounts/search", params={"q": "s1", "limit": 2}).json()
+    found_ids = [a["id"] for a in found["items"]]
+    found_ids += [
+        a["id"]
+        for a in client.get(
+            "/accounts/search", params={"q": "s1", "cursor": found["next_cursor"]}
+        ).json()["items"]
+    ]
+    assert sorted(found_ids) == sorted(ids[1:2] + ids[10:12])
+
+
+def test_lines_are_stored_next_to_their_account(sharded):
+    client, ShardedSession, _ = sharded
+    ids = create_accounts(client, 2)
+
+    line = client.post(
+        f"/accounts/{ids[0]}/lines", json={"msisdn": "800000001", "plan_name": "Basic"}
+    ).json()
+    bulk = client.post(
+        f"/accounts/{ids[1]}/lines:bulk",
+        json={"lines": [{"msisdn": "800000002", "plan_name": "Basic"}]},
+    ).json()
+    assert bulk["created"] == 1
+
+    with ShardedSession() as db:
+        router = db.router
+        owners = {k.value: k.shard for k in db.query(ShardKey).filter(ShardKey.kind == "msisdn")}
+    assert owners["+800000001"] == router.shard_for(UUID(ids[0]))
+    assert owners["+800000002"] == router.shard_for(UUID(ids[1]))
+
+    page = client.get(f"/accounts/{ids[0]}/lines").json()
+    assert [item["id"] for item in page["items"]] == [line["id"]]
+    assert client.get("/lines/by-msisdn/+800000001").json()["id"] == line["id"]
+
+    # Lines are eager-loaded from each account's own shard
+    page = client.get("/accounts", params={"include": "lines", "limit": 50}).json()
+    lines_by_account = {a["id"]: [item["id"] for item in a["lines"]] for a in page["items"]}
+    assert lines_by_account[ids[0]] == [line["id"]]
+    assert len(lines_by_account[ids[1]]) == 1
+
+
+def test_allocated_lines_are_stored_on_the_accounts_shard(sharded):
+    client, _, _ = sharded
+    (account_id,) = create_accounts(client, 1)
+
+    # Pools live in the global database; their lines on the account's shard
+    pool = client.post(
+        "/number-pools",
+        json={"name": "Sharded", "range_start": "+810000000", "range_end": "+810000099"},
+    ).json()
+    allocated = client.post(
+        f"/accounts/{account_id}/lines:allocate",
+        json={"pool_id": pool["id"], "plan_name": "Basic"},
+    ).json()
+    assert allocated["msisdn"] == "+810000000"
+    assert client.get(f"/accounts/{account_id}/lines").json()["items"] == [allocated]
+
+
+def test_line_status_changes_run_on_the_owning_shards(sharded):
+    client, _, _ = sharded
+    ids = create_accounts(client, 3)
+    lines = [
+        client.post(
+            f"/accounts/{account_id}/lines", json={"msisdn": f"80000000{i}", "plan_name": "Basic"}
+        ).json()
+        for i, account_id in enumerate(ids)
+    ]
+
+    # Line ids do not encode their shard; lookups by id scatter
+    response = client.patch(f"/lines/{lines[0]['id']}/status", json={"status": "SUSPENDED"})
+    assert response.json()["status"] == "SUSPENDED"
+
+    line_ids = [lines[1]["id"], lines[2]["id"]]
+    job = client.post("/lines/commission:batch", json={"line_ids": line_ids}).json()
+    assert wait_for_job(client, job["id"])["result"]["succeeded"] == 2
+
+    # Set-based status changes run on each owning shard; audits stay global
+    result = client.post("/lines/status:bulk", json={"status": "ACTIVE", "plan_name": "Basic"})
+    assert (result.json()["matched"], result.json()["updated"]) == (3, 1)
+
+    client.put(f"/accounts/{ids[1]}", json={"status": "CLOSED"})
+    page = client.get(f"/accounts/{ids[1]}/lines").json()
+    assert [item["status"] for item in page["items"]] == ["DELETED"]
+    audits = client.get("/audits", params={"action": "cascade_line_status"}).json()["items"]
+    assert [a["resource_id"] for a in audits] == line_ids[:1]
+
+
+def test_idempotency_keys_are_kept_in_the_global_database(sharded):
+    client, _, _ = sharded
+
+    retried = [
+        client.post(
+            "/accounts",
+            json={"full_name": "Retried", "email": "retried@example.com", "phone": "1"},
+            headers={"Idempotency-Key": "retried"},
+        ).json()["id"]
+        for _ in range(2)
+    ]
+    assert retried[0] == retried[1]
+
+
+def test_orphaned_routing_keys_are_swept(sharded):
+    client, ShardedSession, _ = sharded
+    (account_id,) = create_accounts(client, 1)
+
+    # As if the process died between the global commit and the shard commit
+    with ShardedSession() as db:
+        shard = db.router.shard_for(UUID(account_id))
+        db.add(ShardKey(kind="email", value="lost@example.com", shard=shard))
+        db.add(ShardKey(kind="msisdn", value="+820000001", shard=shard))
+        db.commit()
+
+    response = client.post(
+        "/accounts", json={"full_name": "Lost", "email": "lost@example.com", "phone": "1"}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    reconciler = ShardKeyReconciler()
+    with ShardedSession() as db:
+        # Only a key found orphaned by two sweeps in a row is removed
+        assert reconciler.sweep(db, batch_size=1) == 0
+        assert reconciler.sweep(db, batch_size=1) == 2
+
+        keys = {(k.kind, k.value) for k in db.query(ShardKey)}
+    assert keys == {("email", "s0@example.com")}
+
+    response = client.post(
+        "/accounts", json={"full_name": "Lost", "email": "lost@example.com", "phone": "1"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_unique_keys_are_enforced_across_shards(sharded):
+    client, ShardedSession, _ = sharded
+
+    first = client.post(
+        "/accounts", json={"full_name": "A", "email": "dup@example.com", "phone": "1"}
+    ).json()
+
+    # Retry until the second account lands on a different shard from the first
+    with ShardedSession() as db:
+        router = db.router
+    for i in range(50):
+        other = client.post(
+            "/accounts", json={"full_name": "B", "email": f"b{i}@example.com", "phone": "1"}
+        ).json()
+        if router.shard_for(UUID(other["id"])) != router.shard_for(UUID(first["id"])):
+            break
+
+    response = client.put(f"/accounts/{other['id']}", json={"email": "dup@example.com"})
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = client.post(
+        "/accounts", json={"full_name": "C", "email": "dup@example.com", "phone": "1"}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    client.post(f"/accounts/{first['id']}/lines", json={"msisdn": "810000001", "plan_name": "P"})
+    response = client.post(
+        f"/accounts/{other['id']}/lines", json={"msisdn": "810000001", "plan_name": "P"}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    bulk = client.post(
+        f"/accounts/{other['id']}/lines:bulk",
+        json={"lines": [{"msisdn": "810000001", "plan_name": "P"}]},
+    ).json()
+    assert bulk["conflicts"] == 1
+
+    # Renaming frees the old email for reuse
+    client.put(f"/accounts/{first['id']}", json={"email": "renamed@example.com"})
+    response = client.post(
+        "/accounts", json={"full_name": "D", "email": "dup@example.com", "phone": "1"}
+    )
+    assert response.status_code == status.HTTP_200_OK